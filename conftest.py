@@ -7,4 +7,11 @@ from pathlib import Path
 
 # Add the project root to Python path
 root_dir = Path(__file__).parent
-sys.path.insert(0, str(root_dir))
\ No newline at end of file
+sys.path.insert(0, str(root_dir))
+
+# Keep a single CLI entry point; stray copies of main.py would shadow each
+# other on sys.path and in test discovery.
+_entry_points = list(root_dir.glob("main.py")) + [
+    path for folder in ("src", "tests") for path in (root_dir / folder).rglob("main.py")
+]
+assert len(_entry_points) == 1, f"Expected exactly one main.py, found: {_entry_points}"
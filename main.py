@@ -8,19 +8,33 @@ Usage:
     python main.py "Your query" --verbose  # See agent thinking
 """
 
+from __future__ import annotations
+
 import argparse
+import asyncio
+import functools
 import os
-from dotenv import load_dotenv
+import sys
+import threading
+from typing import TYPE_CHECKING
+
+# The agent package pulls in LangGraph, LangChain and the API SDKs, so it is
+# imported inside the functions that run research. That keeps --help and the
+# missing-API-key errors fast.
+if TYPE_CHECKING:
+    from src.agent import AgentConfig
+
+
+_SEP_EQ = "=" * 60
+
+# Streamed report tokens are flushed in groups rather than one by one
+_TOKEN_FLUSH_INTERVAL = 16
 
-from src.agent import run_research, get_report, AgentConfig
-from src.agent.graph import create_graph
-from langchain_core.messages import HumanMessage
+# Stream events read ahead of the printer
+_STREAM_BUFFER_SIZE = 16
 
 
 def main():
-    # Load environment variables from .env file
-    load_dotenv()
-    
     # Parse command line arguments
     parser = argparse.ArgumentParser(
         description="Deep Research Agent - Conduct comprehensive web research on any topic"
@@ -56,319 +70,240 @@ def main():
     
     args = parser.parse_args()
     
+    if not (args.interactive or args.query):
+        parser.print_help()
+        return
+    
+    # Read the .env file without touching os.environ; real environment
+    # variables take precedence over values from the file
+    from dotenv import dotenv_values
+    env = {**dotenv_values(), **os.environ}
+    
     # Verify API keys
-    if not os.getenv("OPENAI_API_KEY"):
+    if not env.get("OPENAI_API_KEY"):
         print("Error: OPENAI_API_KEY not found in environment")
         print("Please set it in your .env file or environment")
         return
     
-    if not os.getenv("TAVILY_API_KEY"):
+    if not env.get("TAVILY_API_KEY"):
         print("Error: TAVILY_API_KEY not found in environment")
         print("Please set it in your .env file or environment")
         return
     
+    from src.agent import AgentConfig
+    
     # Create configuration
     config = AgentConfig(
         model_name=args.model,
-        max_iterations=args.max_iterations
+        max_iterations=args.max_iterations,
+        openai_api_key=env.get("OPENAI_API_KEY"),
+        tavily_api_key=env.get("TAVILY_API_KEY"),
     )
     
     if args.interactive:
         run_interactive(config, args.verbose)
-    elif args.query:
-        run_single_query(args.query, config, args.verbose)
     else:
-        parser.print_help()
+        run_single_query(args.query, config, args.verbose)
 
 
 def run_single_query(query: str, config: AgentConfig, verbose: bool = False):
     """Run a single research query."""
-    print(f"\n{'='*60}")
+    print(f"\n{_SEP_EQ}")
     print(f"Research Topic: {query}")
     print(f"Model: {config.model_name}")
     print(f"Max Iterations: {config.max_iterations}")
     if verbose:
         print(f"Verbose Mode: ON")
-    print(f"{'='*60}\n")
+    print(f"{_SEP_EQ}\n")
     
-    if verbose:
-        run_with_streaming(query, config)
-    else:
+    if not verbose:
         print("Researching... This may take a minute or two.\n")
-        try:
-            result = run_research(query, config)
-            report = get_report(result)
-            
-            print(f"\n{'='*60}")
-            print("RESEARCH REPORT")
-            print(f"{'='*60}\n")
-            print(report)
-            print(f"\n{'='*60}")
-            
-            # Print some stats
-            sources = result.get("sources", [])
-            iterations = result.get("iteration", 0)
-            print(f"\nStats: {iterations} iterations, {len(sources)} sources gathered")
-            
-        except Exception as e:
-            print(f"Error during research: {e}")
-            raise
+    asyncio.run(run_with_streaming(query, config, verbose=verbose))
 
 
-def run_with_streaming(query: str, config: AgentConfig):
-    """Run research with verbose output showing each step."""
+async def run_with_streaming(query: str, config: AgentConfig, graph=None, verbose: bool = True):
+    """Run research, streaming the report as it is written."""
+    from langchain_core.messages import AIMessageChunk
+    from src.agent import create_graph, get_report, initial_state
+    from src.agent._stream import buffered
+    from src.agent.nodes import http_session
     
-    # Create the graph with verbose mode enabled
-    graph = create_graph(config, verbose=True)
+    if graph is None:
+        graph = create_graph(config, verbose=verbose)
     
-    # Set up initial state
-    initial_state = {
-        "messages": [HumanMessage(content=query)],
-        "topic": "",
-        "running_summary": "",
-        "sources": [],
-        "search_results": [],
-        "current_query": "",
-        "iteration": 0,
-        "max_iterations": config.max_iterations
-    }
+    state = initial_state(query, config)
     
-    print("Starting research...\n")
+    if verbose:
+        print("Starting research...\n", flush=True)
+    title = "FINAL RESEARCH REPORT" if verbose else "RESEARCH REPORT"
     
     try:
-        # Simply invoke the graph - verbose logging happens inside nodes
-        result = graph.invoke(initial_state)
+        # Node internals are logged by the nodes themselves in verbose mode;
+        # here we only forward report tokens as they arrive. "values" emits
+        # the reducer-merged state once per step, so the last one is the
+        # final state without rebuilding it from per-event payloads.
+        result = {}
+        report_started = False
+        tokens_written = 0
+        async with http_session():
+            # Read ahead so the graph keeps producing while tokens are printed.
+            async for mode, payload in buffered(
+                graph.astream(state, stream_mode=["messages", "values"]),
+                _STREAM_BUFFER_SIZE,
+            ):
+                if mode == "values":
+                    result = payload
+                    continue
+                chunk, metadata = payload
+                # Skip the finished AIMessage the node writes to state; its
+                # tokens have already been streamed as chunks.
+                if not isinstance(chunk, AIMessageChunk):
+                    continue
+                if metadata.get("langgraph_node") != "write_report":
+                    continue
+                if not report_started:
+                    print(f"\n{_SEP_EQ}", flush=True)
+                    print(title, flush=True)
+                    print(f"{_SEP_EQ}\n", flush=True)
+                    report_started = True
+                sys.stdout.write(chunk.content)
+                tokens_written += 1
+                if tokens_written % _TOKEN_FLUSH_INTERVAL == 0:
+                    sys.stdout.flush()
         
-        # Extract the report from messages
-        report = ""
-        if "messages" in result:
-            messages = result["messages"]
-            if isinstance(messages, list):
-                for msg in reversed(messages):
-                    if hasattr(msg, "content"):
-                        report = msg.content
-                        break
-            elif hasattr(messages, "content"):
-                report = messages.content
+        sys.stdout.flush()
         
-        print(f"\n{'='*60}")
-        print("FINAL RESEARCH REPORT")
-        print(f"{'='*60}\n")
-        print(report if report else "No report generated.")
-        print(f"\n{'='*60}")
+        if not report_started:
+            # The model did not stream (e.g. a provider without token
+            # streaming), so print the finished report in one go.
+            report = get_report(result) if result.get("messages") else ""
+            print(f"\n{_SEP_EQ}", flush=True)
+            print(title, flush=True)
+            print(f"{_SEP_EQ}\n", flush=True)
+            print(report if report else "No report generated.", flush=True)
+        
+        print(f"\n\n{_SEP_EQ}", flush=True)
         
         sources = result.get("sources", [])
         iterations = result.get("iteration", 0)
-        print(f"\nStats: {iterations} iterations, {len(sources)} sources gathered")
+        print(f"\nStats: {iterations} iterations, {len(sources)} sources gathered", flush=True)
         
     except Exception as e:
-        print(f"Error during research: {e}")
+        print(f"Error during research: {e}", flush=True)
         raise
 
 
-def print_node_output(node_name: str, output: dict):
-    """Pretty print the output of each node with detailed internal information."""
-    
-    # Handle None output
-    if output is None:
-        output = {}
-    
-    # Get verbose info if available
-    verbose_info = output.get("_verbose", {})
-    
-    # Define descriptions for each node
-    descriptions = {
-        "initialize": "INITIALIZING RESEARCH STATE",
-        "generate_query": "GENERATING SEARCH QUERY",
-        "search": "EXECUTING WEB SEARCH",
-        "summarize": "SUMMARIZING RESULTS",
-        "reflect": "REFLECTING ON PROGRESS",
-        "write_report": "WRITING FINAL REPORT"
-    }
-    
-    description = descriptions.get(node_name, "PROCESSING")
+def run_interactive(config: AgentConfig, verbose: bool = False):
+    """Run in interactive mode."""
+    print(f"\n{_SEP_EQ}")
+    print("Deep Research Agent - Interactive Mode")
+    print(f"Model: {config.model_name}")
+    print(f"Max Iterations: {config.max_iterations}")
+    if verbose:
+        print(f"Verbose Mode: ON")
+    print("Type 'quit' or 'exit' to stop")
+    print(f"{_SEP_EQ}\n")
     
-    print(f"\n{'='*60}")
-    print(f"[NODE] {description}")
-    print(f"{'='*60}")
+    try:
+        asyncio.run(_interactive_loop(config, verbose))
+    except KeyboardInterrupt:
+        print("\n\nGoodbye!")
+
+
+async def _interactive_loop(config: AgentConfig, verbose: bool = False):
+    """
+    Read topics and run each one as a background task.
     
-    if node_name == "initialize":
-        # Get topic from verbose_info first, then output, then empty string
-        topic = verbose_info.get("topic_extracted") or output.get("topic") or "(not set)"
-        print(f"\n  Input:")
-        print(f"    - User query from messages")
-        print(f"\n  Output:")
-        print(f"    - Topic: \"{topic}\"")
-        print(f"    - Running summary: (empty)")
-        print(f"    - Sources: []")
-        print(f"    - Iteration: 0")
+    The next prompt is shown as soon as a query is submitted, so network-bound
+    research for one topic overlaps with typing the next. Verbose runs stay in
+    the foreground because their node-by-node output would interleave.
+    """
+    from src.agent import arun_research_with_graph, create_graph
     
-    elif node_name == "generate_query":
-        # Get values with proper fallbacks
-        prompt = verbose_info.get("prompt_sent") or "(prompt not captured)"
-        llm_response = verbose_info.get("llm_response") or "(response not captured)"
-        final_query = verbose_info.get("final_query") or output.get("current_query") or "(no query)"
-        
-        print(f"\n  LLM Call:")
-        print(f"    - Model: Generating search query based on topic and current knowledge")
-        print(f"\n  Prompt Sent to LLM:")
-        print(f"    {_truncate_text(prompt, 300)}")
-        print(f"\n  LLM Response:")
-        print(f"    \"{llm_response}\"")
-        print(f"\n  Output:")
-        print(f"    - Search query: \"{final_query}\"")
+    # Build the graph (and its LLM/search clients) once for the whole session
+    graph = create_graph(config, verbose=verbose)
+    pending: list[asyncio.Task] = []
     
-    elif node_name == "search":
-        # Get values with proper fallbacks
-        tool_name = verbose_info.get("tool_name") or "Tavily Search"
-        query = verbose_info.get("query") or output.get("current_query") or "(no query)"
-        max_results = verbose_info.get("max_results") or 5
-        search_depth = verbose_info.get("search_depth") or "advanced"
-        results = verbose_info.get("results") or output.get("_search_results") or []
-        error = verbose_info.get("error")
-        total_sources = verbose_info.get("total_sources") or len(output.get("sources", []))
+    while True:
+        try:
+            query = (await _ainput("\nEnter your research topic: ")).strip()
+        except EOFError:
+            break
         
-        print(f"\n  Tool Call:")
-        print(f"    - Tool: {tool_name}")
-        print(f"    - Query: \"{query}\"")
-        print(f"    - Max Results: {max_results}")
-        print(f"    - Search Depth: {search_depth}")
+        if query.lower() in ["quit", "exit", "q"]:
+            break
         
-        if error:
-            print(f"\n  Error:")
-            print(f"    {error}")
-        else:
-            print(f"\n  Results Found ({len(results)}):")
-            if results:
-                for i, result in enumerate(results[:5], 1):  # Show up to 5
-                    title = result.get("title", "No title")[:60]
-                    url = result.get("url", "")
-                    content_preview = _truncate_text(result.get("content", ""), 100)
-                    print(f"\n    [{i}] {title}")
-                    print(f"        URL: {url}")
-                    print(f"        Content: {content_preview}")
-            else:
-                print(f"    (no results)")
-            
-            print(f"\n  Output:")
-            print(f"    - Total sources collected: {total_sources}")
-    
-    elif node_name == "summarize":
-        if verbose_info.get("skipped"):
-            print(f"\n  Skipped: {verbose_info.get('reason') or 'No results'}")
-        else:
-            prompt = verbose_info.get("prompt_sent") or "(prompt not captured)"
-            llm_response = verbose_info.get("llm_response") or output.get("running_summary") or "(no summary)"
-            summary_length = verbose_info.get("summary_length") or len(output.get("running_summary", ""))
-            iteration = verbose_info.get("iteration") or output.get("iteration") or 0
-            
-            print(f"\n  LLM Call:")
-            print(f"    - Model: Updating running summary with new information")
-            print(f"\n  Prompt Sent to LLM:")
-            print(f"    {_truncate_text(prompt, 300)}")
-            print(f"\n  LLM Response (Updated Summary):")
-            print(f"    {_truncate_text(llm_response, 500)}")
-            print(f"\n  Output:")
-            print(f"    - Summary length: {summary_length} characters")
-            print(f"    - Iteration: {iteration}")
-    
-    elif node_name == "reflect":
-        iteration = verbose_info.get("iteration") or 0
-        max_iterations = verbose_info.get("max_iterations") or 5
-        summary_length = verbose_info.get("summary_length") or 0
-        llm_consulted = verbose_info.get("llm_consulted", False)
-        llm_response = verbose_info.get("llm_response") or ""
-        decision = verbose_info.get("decision") or "(unknown)"
-        reason = verbose_info.get("reason") or "(no reason captured)"
+        if not query:
+            continue
         
-        print(f"\n  Current State:")
-        print(f"    - Iteration: {iteration}/{max_iterations}")
-        print(f"    - Summary length: {summary_length} characters")
+        if verbose:
+            try:
+                await run_with_streaming(query, config, graph)
+            except Exception as e:
+                print(f"Error: {e}")
+            continue
         
-        if llm_consulted:
-            print(f"\n  LLM Call:")
-            print(f"    - Model: Evaluating if research is sufficient")
-            print(f"\n  LLM Response:")
-            print(f"    \"{llm_response}\"")
-        else:
-            print(f"\n  LLM Call:")
-            print(f"    - Skipped (decision made by rule)")
-        
-        print(f"\n  Decision:")
-        print(f"    - Next node: {decision}")
-        print(f"    - Reason: {reason}")
+        print(f"\nResearching \"{query}\" in the background...")
+        task = asyncio.create_task(arun_research_with_graph(graph, query, config))
+        task.add_done_callback(functools.partial(_print_research_result, query))
+        pending = [t for t in pending if not t.done()]
+        pending.append(task)
     
-    elif node_name == "write_report":
-        prompt = verbose_info.get("prompt_sent") or "(prompt not captured)"
-        sources_count = verbose_info.get("sources_count") or 0
-        report_length = verbose_info.get("report_length") or 0
-        
-        print(f"\n  LLM Call:")
-        print(f"    - Model: Generating final research report")
-        print(f"\n  Prompt Sent to LLM:")
-        print(f"    {_truncate_text(prompt, 400)}")
-        print(f"\n  Output:")
-        print(f"    - Sources cited: {sources_count}")
-        print(f"    - Report length: {report_length} characters")
-        print(f"    - Report generated successfully")
+    pending = [t for t in pending if not t.done()]
+    if pending:
+        print(f"Waiting for {len(pending)} research task(s) to finish...")
+        await asyncio.gather(*pending, return_exceptions=True)
+    
+    print("Goodbye!")
 
 
-def _truncate_text(text: str, max_length: int) -> str:
-    """Truncate text and add ellipsis if needed."""
-    if not text:
-        return "(empty)"
-    # Clean up whitespace
-    text = " ".join(text.split())
-    if len(text) <= max_length:
-        return text
-    return text[:max_length] + "..."
+async def _ainput(prompt: str) -> str:
+    """Read a line from stdin without blocking the event loop."""
+    # A daemon thread (rather than asyncio.to_thread) so Ctrl+C can exit while
+    # input() is still waiting, instead of joining the blocked executor thread.
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def _settle(setter, value):
+        if not future.done():
+            setter(value)
+    
+    def _read():
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(_settle, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(_settle, future.set_result, line)
+    
+    threading.Thread(target=_read, daemon=True).start()
+    return await future
 
 
-def run_interactive(config: AgentConfig, verbose: bool = False):
-    """Run in interactive mode."""
-    print(f"\n{'='*60}")
-    print("Deep Research Agent - Interactive Mode")
-    print(f"Model: {config.model_name}")
-    print(f"Max Iterations: {config.max_iterations}")
-    if verbose:
-        print(f"Verbose Mode: ON")
-    print("Type 'quit' or 'exit' to stop")
-    print(f"{'='*60}\n")
+def _print_research_result(query: str, task: asyncio.Task):
+    """Print the report (or error) for a finished background research task."""
+    from src.agent import get_report
     
-    while True:
-        try:
-            query = input("\nEnter your research topic: ").strip()
-            
-            if query.lower() in ["quit", "exit", "q"]:
-                print("Goodbye!")
-                break
-            
-            if not query:
-                continue
-            
-            if verbose:
-                run_with_streaming(query, config)
-            else:
-                print("\nResearching... This may take a minute or two.\n")
-                
-                result = run_research(query, config)
-                report = get_report(result)
-                
-                print(f"\n{'='*60}")
-                print("RESEARCH REPORT")
-                print(f"{'='*60}\n")
-                print(report)
-                print(f"\n{'='*60}")
-                
-                sources = result.get("sources", [])
-                iterations = result.get("iteration", 0)
-                print(f"\nStats: {iterations} iterations, {len(sources)} sources gathered")
-            
-        except KeyboardInterrupt:
-            print("\n\nGoodbye!")
-            break
-        except Exception as e:
-            print(f"Error: {e}")
+    if task.cancelled():
+        return
+    
+    error = task.exception()
+    if error is not None:
+        print(f"\nError researching \"{query}\": {error}")
+        return
+    
+    result = task.result()
+    report = get_report(result)
+    
+    print(f"\n{_SEP_EQ}")
+    print(f"RESEARCH REPORT: {query}")
+    print(f"{_SEP_EQ}\n")
+    print(report)
+    print(f"\n{_SEP_EQ}")
+    
+    sources = result.get("sources", [])
+    iterations = result.get("iteration", 0)
+    print(f"\nStats: {iterations} iterations, {len(sources)} sources gathered")
 
 
 if __name__ == "__main__":
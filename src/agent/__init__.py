@@ -1,13 +1,25 @@
 """Deep Research Agent package."""
 
-from .graph import create_graph, run_research, get_report
+from .graph import (
+    create_graph,
+    run_research,
+    arun_research,
+    run_research_with_graph,
+    arun_research_with_graph,
+    get_report,
+    initial_state,
+)
 from .state import ResearchState
 from .config import AgentConfig
 
 __all__ = [
     "create_graph",
     "run_research", 
+    "arun_research",
+    "run_research_with_graph",
+    "arun_research_with_graph",
     "get_report",
+    "initial_state",
     "ResearchState",
     "AgentConfig"
 ]
\ No newline at end of file
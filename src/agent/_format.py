@@ -0,0 +1,20 @@
+"""
+Text formatting helpers shared by the nodes' verbose logging and the CLI.
+"""
+
+
+def truncate_text(text: str, max_length: int = 200) -> str:
+    """Truncate text for display and add ellipsis if needed."""
+    if not text:
+        return "(empty)"
+    # Clean up whitespace on a prefix only, so long summaries aren't split
+    # and re-joined in full. Collapsing a prefix yields a prefix of the
+    # collapsed whole, so grow it until it is long enough or covers the text.
+    end = max_length + 1
+    while True:
+        head = " ".join(text[:end].split())
+        if len(head) > max_length:
+            return head[:max_length] + "..."
+        if end >= len(text):
+            return head
+        end *= 2
@@ -0,0 +1,101 @@
+"""
+Hedged requests for calls with a long latency tail.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """
+    Running estimate of a call's 95th-percentile latency.
+    
+    Takes the percentile over the most recent `window` latencies, so the
+    estimate follows the service as it speeds up or slows down without
+    assuming a shape for the (usually long-tailed) distribution. Until
+    `min_samples` latencies are recorded it reports the given default, since
+    a handful of samples says little about the tail.
+    """
+    
+    def __init__(self, default: float, window: int = 100, min_samples: int = 10, floor: float = 0.25):
+        self._default = default
+        self._min_samples = min_samples
+        self._floor = floor
+        self._samples: deque[float] = deque(maxlen=window)
+    
+    def record(self, seconds: float) -> None:
+        """Add one observed latency."""
+        self._samples.append(seconds)
+    
+    @property
+    def p95(self) -> float:
+        """Estimated 95th-percentile latency in seconds."""
+        if len(self._samples) < self._min_samples:
+            return self._default
+        ordered = sorted(self._samples)
+        return max(self._floor, ordered[math.ceil(0.95 * len(ordered)) - 1])
+
+
+async def hedged(call: Callable[[], Awaitable[T]], delay: float) -> T:
+    """
+    Await call(), starting a second identical call if the first is slow.
+    
+    If the first call fails, or hasn't finished after `delay` seconds, a
+    backup call is started and whichever succeeds first wins; the other is
+    cancelled. An error is only raised if both calls fail.
+    """
+    primary = asyncio.ensure_future(call())
+    pending = {primary}
+    error: Optional[BaseException] = None
+    try:
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if done:
+            if primary.exception() is None:
+                return primary.result()
+            error = primary.exception()
+        pending.add(asyncio.ensure_future(call()))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def timed_hedged(
+    call: Callable[[], Awaitable[T]],
+    tracker: LatencyTracker,
+) -> T:
+    """
+    Run a hedged call using the tracker's p95 as the delay, and record its latency.
+    
+    The latency recorded is the first call's, not the winner's: a fast backup
+    only says how quick a retry was, and recording it would pull the delay
+    down and make hedging feed itself. When the backup wins, the first call
+    is recorded at the time it was given up on, which is at least the delay.
+    """
+    start = time.perf_counter()
+    primary_latency: Optional[float] = None
+    started = False
+    
+    async def timed_call() -> T:
+        nonlocal primary_latency, started
+        if started:
+            return await call()
+        started = True
+        result = await call()
+        primary_latency = time.perf_counter() - start
+        return result
+    
+    result = await hedged(timed_call, tracker.p95)
+    tracker.record(primary_latency if primary_latency is not None else time.perf_counter() - start)
+    return result
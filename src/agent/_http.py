@@ -0,0 +1,62 @@
+"""
+Shared HTTP connection pooling for the OpenAI and Tavily clients.
+"""
+
+import asyncio
+import contextlib
+from typing import AsyncIterator
+
+import httpx
+
+
+class PerLoopTransport(httpx.AsyncBaseTransport):
+    """
+    An httpx transport that keeps one connection pool per event loop.
+    
+    Pooled connections belong to the loop that opened them, and the sync
+    entry points start a fresh loop for every run, so a single process-wide
+    pool would hand out dead connections on the second run.
+    
+    Open connections keep their loop alive, so a loop's pool is never
+    released on its own: runs hold it through session(), which closes it
+    once the last run on the loop is done.
+    """
+    
+    def __init__(self, **pool_kwargs):
+        self._pool_kwargs = pool_kwargs
+        self._pools: dict[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport] = {}
+        self._sessions: dict[asyncio.AbstractEventLoop, int] = {}
+    
+    def _pool(self) -> httpx.AsyncHTTPTransport:
+        """Return the connection pool for the running event loop."""
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            pool = self._pools[loop] = httpx.AsyncHTTPTransport(**self._pool_kwargs)
+        return pool
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool().handle_async_request(request)
+    
+    @contextlib.asynccontextmanager
+    async def session(self) -> AsyncIterator[None]:
+        """
+        Keep the running loop's pool open for one run.
+        
+        Concurrent runs on the same loop share the pool; it is closed, with
+        its keep-alive connections, when the last of them finishes.
+        """
+        loop = asyncio.get_running_loop()
+        self._sessions[loop] = self._sessions.get(loop, 0) + 1
+        try:
+            yield
+        finally:
+            self._sessions[loop] -= 1
+            if not self._sessions[loop]:
+                del self._sessions[loop]
+                await self.aclose()
+    
+    async def aclose(self) -> None:
+        pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool.aclose()
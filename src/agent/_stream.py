@@ -0,0 +1,51 @@
+"""
+Async iterator helpers for consuming graph streams.
+"""
+
+import asyncio
+from typing import AsyncIterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+async def buffered(source: AsyncIterator[T], size: int = 16) -> AsyncIterator[T]:
+    """
+    Read ahead from an async iterator in a background task.
+    
+    Up to `size` items are queued, so the producer (the graph) keeps running
+    while the consumer (the printer) handles earlier items. Errors from the
+    source are re-raised to the consumer, and the producer is cancelled if
+    the consumer stops early.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+    
+    async def produce():
+        try:
+            async for item in source:
+                await queue.put(item)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(_DONE)
+        finally:
+            aclose = getattr(source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+    
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
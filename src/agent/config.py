@@ -2,22 +2,31 @@
 Configuration and prompts for the Deep Research Agent.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AgentConfig:
     """Configuration for the research agent."""
     
     # LLM settings
     model_name: str = "gpt-4o-mini"
     temperature: float = 0
+    router_model_name: str = "gpt-4o-mini"  # small model for the one-word continue/stop decision
     
     # Search settings
     max_iterations: int = 5
     max_search_results: int = 5
     search_depth: str = "advanced"  # "basic" or "advanced"
+    parallel_queries: int = 3  # searches run in parallel per iteration
+    max_chars_per_source: int = 1500  # longer result content is trimmed before summarizing
+    search_hedge_delay: Optional[float] = 2.0  # seconds before a slow search is retried in parallel (None turns it off)
+    
+    # Reflection settings
+    min_sufficient_chars: int = 2000  # summaries this long end research without asking the LLM
+    min_sources: Optional[int] = None  # when set, this many sources also end research...
+    min_iterations: int = 2  # ...once this many iterations have run
     
     # API keys (optional, will use env vars if not provided)
     openai_api_key: Optional[str] = None
@@ -27,15 +36,14 @@ class AgentConfig:
 
 
 # PROMPTS
+#
+# Each prompt starts with its fixed instructions and ends with the values
+# that change between calls (topic first, then the research so far). Keeping
+# the static text up front lets providers reuse their cached prompt prefix.
 
 
 GENERATE_QUERY_PROMPT = """You are a research assistant helping to gather information on a topic.
 
-TOPIC: {topic}
-
-CURRENT SUMMARY OF RESEARCH:
-{running_summary}
-
 Based on the topic and what has been researched so far, generate the next search query to find NEW, RELEVANT information that we don't already have.
 
 If the current summary is empty, generate a broad initial query about the topic.
@@ -46,39 +54,64 @@ Requirements:
 - Focus on finding NEW information not already in the summary
 - Be specific enough to get relevant results
 
+TOPIC: {topic}
+
+CURRENT SUMMARY OF RESEARCH:
+{running_summary}
+
 Return ONLY the search query, nothing else."""
 
 
-SUMMARIZE_PROMPT = """You are a research assistant. Your job is to update a running summary with new information.
+GENERATE_SUB_QUERIES_PROMPT = """You are a research assistant helping to gather information on a topic.
+
+Based on the topic and what has been researched so far, generate {num_queries} search queries to find NEW, RELEVANT information that we don't already have. The queries will be searched in parallel.
+
+If the current summary is empty, generate broad initial queries covering different aspects of the topic.
+If we already have some information, identify GAPS or MISSING ASPECTS and search for those.
+
+Requirements:
+- Keep each query concise (3-7 words work best)
+- Make each query cover a DIFFERENT aspect; don't repeat the same search in other words
+- Focus on finding NEW information not already in the summary
 
 TOPIC: {topic}
 
-CURRENT SUMMARY:
+CURRENT SUMMARY OF RESEARCH:
 {running_summary}
 
-NEW SEARCH RESULTS:
-{search_results}
+Return ONLY the search queries, one per line, nothing else."""
+
+
+SUMMARIZE_PROMPT = """You are a research assistant. Your job is to extend a running summary with new information.
 
 Instructions:
 1. Read the new search results carefully
 2. Extract information that is RELEVANT to the topic
-3. Add NEW information to the summary (don't repeat what's already there)
-4. Keep the summary well-organized and coherent
+3. Write ONLY a new paragraph covering facts from the search results that are NOT already in the current summary
+4. Do not rewrite, repeat or restate the current summary; your paragraph is appended after it
 5. Note the source URLs for important facts
 
-If the new results don't contain useful new information, return the current summary unchanged.
+If the new results don't contain useful new information, respond with exactly: NO NEW INFORMATION
 
-Return the updated summary:"""
+TOPIC: {topic}
 
+CURRENT SUMMARY:
+{running_summary}
 
-REFLECT_PROMPT = """You are evaluating whether we have enough research to write a comprehensive report.
+NEW SEARCH RESULTS:
+{search_results}
 
-TOPIC: {topic}
+Return the new paragraph:"""
 
-CURRENT RESEARCH SUMMARY:
-{running_summary}
 
-ITERATIONS COMPLETED: {iteration} / {max_iterations}
+# Stands in for the running summary before anything has been researched
+EMPTY_SUMMARY = "No research yet."
+
+# Reply to SUMMARIZE_PROMPT when the results add nothing to the summary
+NO_NEW_INFORMATION = "NO NEW INFORMATION"
+
+
+REFLECT_PROMPT = """You are evaluating whether we have enough research to write a comprehensive report.
 
 Evaluate the research so far:
 1. Do we have enough information to thoroughly address the topic?
@@ -88,18 +121,17 @@ Evaluate the research so far:
 If we have sufficient information OR we've reached max iterations, respond with: SUFFICIENT
 If we need more research and have iterations remaining, respond with: CONTINUE
 
-Respond with ONLY one word: either SUFFICIENT or CONTINUE"""
+TOPIC: {topic}
 
+CURRENT RESEARCH SUMMARY:
+{running_summary}
 
-WRITE_REPORT_PROMPT = """You are an expert research report writer. Write a comprehensive report based on the research gathered.
+ITERATIONS COMPLETED: {iteration} / {max_iterations}
 
-TOPIC: {topic}
+Respond with ONLY one word: either SUFFICIENT or CONTINUE"""
 
-RESEARCH SUMMARY:
-{running_summary}
 
-SOURCES USED:
-{sources}
+WRITE_REPORT_PROMPT = """You are an expert research report writer. Write a comprehensive report based on the research gathered.
 
 Write a well-structured report that:
 1. Has a clear introduction stating what the report covers
@@ -110,4 +142,12 @@ Write a well-structured report that:
 
 Write the report in a professional, informative tone.
 
-REPORT:"""
\ No newline at end of file
+TOPIC: {topic}
+
+RESEARCH SUMMARY:
+{running_summary}
+
+SOURCES USED:
+{sources}
+
+REPORT:"""
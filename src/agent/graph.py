@@ -1,12 +1,17 @@
+import asyncio
+from functools import lru_cache
+
 from langgraph.graph import StateGraph, START, END
 from langchain_core.messages import HumanMessage
 
 from .state import ResearchState
 from .config import AgentConfig
 from .nodes import (
+    http_session,
     init_agent,
     initialize_state,
     generate_query,
+    route_searches,
     search,
     summarize,
     reflect,
@@ -29,6 +34,14 @@ def create_graph(config: AgentConfig = None, verbose: bool = False) -> StateGrap
     # Initialize the agent components
     init_agent(config, verbose=verbose)
     
+    # The graph topology doesn't depend on config (nodes read the clients set
+    # up by init_agent), so it is compiled once and shared.
+    return _compile_graph()
+
+
+@lru_cache(maxsize=None)
+def _compile_graph() -> StateGraph:
+    """Build and compile the research graph."""
     # Create the graph
     graph = StateGraph(ResearchState)
     
@@ -43,7 +56,9 @@ def create_graph(config: AgentConfig = None, verbose: bool = False) -> StateGrap
     # Define the flow
     graph.add_edge(START, "initialize")
     graph.add_edge("initialize", "generate_query")
-    graph.add_edge("generate_query", "search")
+    
+    # Fan out: one parallel search branch per generated query
+    graph.add_conditional_edges("generate_query", route_searches, ["search"])
     graph.add_edge("search", "summarize")
     graph.add_edge("summarize", "reflect")
     
@@ -63,6 +78,23 @@ def create_graph(config: AgentConfig = None, verbose: bool = False) -> StateGrap
     return graph.compile()
 
 
+def initial_state(query: str, config: AgentConfig = None) -> dict:
+    """Build the initial graph state for a research query."""
+    return {
+        "messages": [HumanMessage(content=query)],
+        "topic": "",
+        "running_summary": "",
+        "prev_summary_len": 0,
+        "sources": [],
+        "seen_hashes": set(),
+        "search_results": [],
+        "current_query": "",
+        "sub_queries": [],
+        "iteration": 0,
+        "max_iterations": config.max_iterations if config else 5
+    }
+
+
 def run_research(
     query: str,
     config: AgentConfig = None
@@ -77,25 +109,60 @@ def run_research(
     Returns:
         Final state including the report in messages
     """
-    # Create the graph
-    graph = create_graph(config)
+    return run_research_with_graph(create_graph(config), query, config)
+
+
+async def arun_research(
+    query: str,
+    config: AgentConfig = None
+) -> dict:
+    """
+    Async counterpart of run_research.
     
-    # Set up initial state
-    initial_state = {
-        "messages": [HumanMessage(content=query)],
-        "topic": "",
-        "running_summary": "",
-        "sources": [],
-        "search_results": [],
-        "current_query": "",
-        "iteration": 0,
-        "max_iterations": config.max_iterations if config else 5
-    }
+    Lets callers run several research queries concurrently on one event loop.
+    
+    Args:
+        query: The research topic/question
+        config: Optional configuration
+        
+    Returns:
+        Final state including the report in messages
+    """
+    return await arun_research_with_graph(create_graph(config), query, config)
+
+
+def run_research_with_graph(
+    graph,
+    query: str,
+    config: AgentConfig = None
+) -> dict:
+    """
+    Run research on a query using an already created graph.
     
-    # Run the graph
-    result = graph.invoke(initial_state)
+    Use this when running many queries with the same configuration so the
+    clients set up by create_graph are reused between them. The I/O nodes are
+    coroutines, so this drives the graph with asyncio.run; from inside an
+    event loop, await arun_research_with_graph instead.
     
-    return result
+    Args:
+        graph: Compiled graph returned by create_graph
+        query: The research topic/question
+        config: Configuration the graph was created with
+        
+    Returns:
+        Final state including the report in messages
+    """
+    return asyncio.run(arun_research_with_graph(graph, query, config))
+
+
+async def arun_research_with_graph(
+    graph,
+    query: str,
+    config: AgentConfig = None
+) -> dict:
+    """Async counterpart of run_research_with_graph."""
+    async with http_session():
+        return await graph.ainvoke(initial_state(query, config))
 
 
 def get_report(result: dict) -> str:
@@ -1,26 +1,41 @@
 """
 Node functions for the Deep Research Agent.
 
-Each function represents a step in the research process:
+Each function represents a step in the research process. The steps that
+call the LLM or the search API are coroutines, so LangGraph runs them on the
+event loop and parallel branches overlap their network waits:
 1. initialize_state - Set up initial state from user query
-2. generate_query - Create search query based on current knowledge
-3. search - Execute web search
+2. generate_query - Create search queries based on current knowledge
+3. search - Execute web search (one parallel branch per query)
 4. summarize - Update running summary with new findings
 5. reflect - Decide whether to continue or stop
 6. write_report - Generate final report
 """
 
+import hashlib
+import importlib.util
+import logging
 import os
-from typing import Literal
-from langchain_openai import ChatOpenAI
+import re
+import sys
+from itertools import islice
+from typing import Literal, Optional
+
+import httpx
 from langchain_core.messages import HumanMessage, AIMessage
-from tavily import TavilyClient
+from langgraph.types import Send
 
+from ._format import truncate_text
+from ._hedge import LatencyTracker, timed_hedged
+from ._http import PerLoopTransport
 from .state import ResearchState
 from .config import (
     AgentConfig,
+    EMPTY_SUMMARY,
     GENERATE_QUERY_PROMPT,
+    GENERATE_SUB_QUERIES_PROMPT,
     SUMMARIZE_PROMPT,
+    NO_NEW_INFORMATION,
     REFLECT_PROMPT,
     WRITE_REPORT_PROMPT,
 )
@@ -28,56 +43,177 @@ from .config import (
 
 # Global instances (initialized in init_agent)
 llm = None
+router_llm = None
 search_client = None
 config = None
-verbose_mode = False
+
+logger = logging.getLogger(__name__)
+
+_SEP_EQ = "=" * 60
+
+# The OpenAI and Tavily SDKs are slow to import, so they are loaded by
+# init_agent (through __getattr__ below) rather than with this module.
+_LAZY_IMPORTS = {
+    "ChatOpenAI": "langchain_openai",
+    "AsyncTavilyClient": "tavily",
+}
+
+
+def __getattr__(name: str):
+    """Import a lazily loaded SDK class on first access."""
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+# Connection pooling shared by the OpenAI and Tavily clients. It outlives
+# init_agent() so keep-alive connections (and their TLS sessions) are reused
+# across iterations, parallel searches and concurrent interactive queries.
+# Each run holds it through http_session(), which closes it afterwards.
+# HTTP/2 needs the optional h2 package (pip install httpx[http2]), so it is
+# only turned on when that is installed.
+_http_transport = PerLoopTransport(
+    http2=importlib.util.find_spec("h2") is not None,
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+)
+_HTTP_TIMEOUT = 30.0
+
+# Latency of Tavily searches, used to decide when a slow search is hedged
+# with a second identical request. init_agent sets the starting delay.
+_search_latency: Optional[LatencyTracker] = None
+
+# Answers to repeatable LLM calls (query generation and the routing decision),
+# keyed on the inputs that decide them. They last for the life of the agent,
+# e.g. an interactive session, and init_agent resets them since the answers
+# depend on the configured model.
+_LLM_CACHE_SIZE = 256
+_query_cache: dict[str, str] = {}
+_reflect_cache: dict[tuple, str] = {}
+
+# Leading "-", "*", "1." or "1)" on a generated query line
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+
+# Sentence boundaries and topic keywords (words of 4+ letters) for trimming
+# long search result content. Common words that long are not keywords, or
+# nearly every sentence would count as on-topic.
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_KEYWORD = re.compile(r"\w{4,}")
+_STOPWORDS = frozenset({
+    "about", "after", "also", "been", "before", "being", "between", "could",
+    "does", "each", "from", "have", "into", "like", "more", "most", "much",
+    "only", "other", "over", "should", "some", "such", "than", "that", "their",
+    "them", "then", "there", "these", "they", "this", "those", "very", "were",
+    "what", "when", "where", "which", "while", "will", "with", "would", "your",
+})
 
 
 def init_agent(agent_config: AgentConfig = None, verbose: bool = False):
     """Initialize the LLM and search client."""
-    global llm, search_client, config, verbose_mode
+    global llm, router_llm, search_client, config, _search_latency
     
     config = agent_config or AgentConfig()
-    verbose_mode = verbose
+    _configure_logging(verbose)
+    _query_cache.clear()
+    _reflect_cache.clear()
+    _search_latency = (
+        LatencyTracker(config.search_hedge_delay)
+        if config.search_hedge_delay is not None else None
+    )
+    
+    # Looked up on the module so the SDKs are imported on first use
+    sdk = sys.modules[__name__]
     
     # Initialize LLM
     api_key = config.openai_api_key or os.getenv("OPENAI_API_KEY")
-    llm = ChatOpenAI(
+    llm = sdk.ChatOpenAI(
         model=config.model_name,
         temperature=config.temperature,
-        api_key=api_key
+        api_key=api_key,
+        http_async_client=_pooled_http_client(),
+    )
+    # The routing decision is a one-word answer, so a small model will do
+    router_llm = sdk.ChatOpenAI(
+        model=config.router_model_name,
+        temperature=0,
+        max_tokens=4,
+        api_key=api_key,
+        http_async_client=_pooled_http_client(),
     )
     
     # Initialize Tavily search
     tavily_key = config.tavily_api_key or os.getenv("TAVILY_API_KEY")
     if not tavily_key:
         raise ValueError("TAVILY_API_KEY is required")
-    search_client = TavilyClient(api_key=tavily_key)
+    search_client = sdk.AsyncTavilyClient(api_key=tavily_key, client=_pooled_http_client())
 
 
-def _log(message: str, indent: int = 0):
-    """Print message if verbose mode is enabled."""
-    if verbose_mode:
-        prefix = "  " * indent
-        print(f"{prefix}{message}")
+def http_session():
+    """
+    Async context manager that holds the shared connection pool for a run.
+    
+    Entry points wrap each research run in it so the run's connections are
+    closed when it ends instead of piling up with every new event loop.
+    """
+    return _http_transport.session()
 
 
-def _log_section(title: str):
-    """Print a section header if verbose mode is enabled."""
-    if verbose_mode:
-        print(f"\n{'='*60}")
-        print(f"[NODE] {title}")
-        print(f"{'='*60}")
+def _pooled_http_client() -> httpx.AsyncClient:
+    """
+    Create an HTTP client backed by the shared connection pool.
+    
+    Each API client gets its own httpx client, since Tavily sets its auth
+    headers and base URL on the client it is given.
+    """
+    return httpx.AsyncClient(transport=_http_transport, timeout=_HTTP_TIMEOUT)
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Log handler that writes to the current sys.stdout, even if it was swapped."""
+    
+    @property
+    def stream(self):
+        return sys.stdout
+    
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def _configure_logging(verbose: bool):
+    """Show the nodes' debug output on stdout in verbose mode, hide it otherwise."""
+    logger.setLevel(logging.DEBUG if verbose else logging.WARNING)
+    if verbose and not logger.handlers:
+        handler = _StdoutHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+
+
+def _verbose() -> bool:
+    """Whether verbose output is on; guards logging that is costly to prepare."""
+    return logger.isEnabledFor(logging.DEBUG)
+
+
+def _cache_put(cache: dict, key, value: str):
+    """Store an LLM answer, evicting the oldest entry when the cache is full."""
+    if len(cache) >= _LLM_CACHE_SIZE:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
 
 
-def _truncate(text: str, max_len: int = 200) -> str:
-    """Truncate text for display."""
-    if not text:
-        return "(empty)"
-    text = " ".join(text.split())  # Normalize whitespace
-    if len(text) <= max_len:
-        return text
-    return text[:max_len] + "..."
+def _log(message: str, *args, indent: int = 0):
+    """Log a verbose message; args are only formatted if it will be shown."""
+    if _verbose():
+        logger.debug("  " * indent + message, *args)
+
+
+def _log_section(title: str):
+    """Log a section header in verbose mode."""
+    if _verbose():
+        logger.debug("\n%s\n[NODE] %s\n%s", _SEP_EQ, title, _SEP_EQ)
 
 
 def initialize_state(state: ResearchState) -> dict:
@@ -97,79 +233,137 @@ def initialize_state(state: ResearchState) -> dict:
             topic = msg.content
             break
     
-    _log("\nInput:", 1)
-    _log("- Extracting topic from user message", 2)
-    _log("\nOutput:", 1)
-    _log(f"- Topic: \"{topic}\"", 2)
-    _log(f"- Running summary: (empty)", 2)
-    _log(f"- Sources: []", 2)
-    _log(f"- Iteration: 0", 2)
+    _log("\nInput:", indent=1)
+    _log("- Extracting topic from user message", indent=2)
+    _log("\nOutput:", indent=1)
+    _log("- Topic: \"%s\"", topic, indent=2)
+    _log("- Running summary: (empty)", indent=2)
+    _log("- Sources: []", indent=2)
+    _log("- Iteration: 0", indent=2)
     
     return {
         "topic": topic,
         "running_summary": "",
+        "prev_summary_len": 0,
         "sources": [],
         "current_query": "",
+        "sub_queries": [],
         "iteration": 0,
         "max_iterations": config.max_iterations if config else 5
     }
 
 
-def generate_query(state: ResearchState) -> dict:
+async def generate_query(state: ResearchState) -> dict:
     """
-    Generate the next search query based on the topic and current summary.
+    Generate the next search queries based on the topic and current summary.
+    
+    Produces up to config.parallel_queries queries, which are searched in
+    parallel (see route_searches).
     """
     _log_section("GENERATING SEARCH QUERY")
     
     topic = state["topic"]
-    running_summary = state.get("running_summary", "") or "No research yet."
-    
-    prompt = GENERATE_QUERY_PROMPT.format(
-        topic=topic,
-        running_summary=running_summary
-    )
-    
-    _log("\nLLM Call:", 1)
-    _log("- Generating search query based on topic and current knowledge", 2)
-    _log("\nPrompt Sent to LLM:", 1)
-    _log(_truncate(prompt, 300), 2)
+    running_summary = state.get("running_summary", "") or EMPTY_SUMMARY
+    num_queries = config.parallel_queries if config else 3
+    
+    if num_queries > 1:
+        prompt = GENERATE_SUB_QUERIES_PROMPT.format(
+            topic=topic,
+            running_summary=running_summary,
+            num_queries=num_queries
+        )
+    else:
+        prompt = GENERATE_QUERY_PROMPT.format(
+            topic=topic,
+            running_summary=running_summary
+        )
     
-    response = llm.invoke(prompt)
-    query = response.content.strip()
+    _log("\nLLM Call:", indent=1)
+    _log("- Generating search query based on topic and current knowledge", indent=2)
+    _log("\nPrompt Sent to LLM:", indent=1)
+    if _verbose():
+        _log("%s", truncate_text(prompt, 300), indent=2)
+    
+    # The same topic and (whitespace-normalized) summary get the same queries
+    cache_key = hashlib.sha1(
+        f"{num_queries}\n{topic}\n{' '.join(running_summary.split())}".encode()
+    ).hexdigest()
+    content = _query_cache.get(cache_key)
+    if content is None:
+        content = (await llm.ainvoke(prompt)).content
+        _cache_put(_query_cache, cache_key, content)
+    else:
+        _log("- Reusing cached response", indent=2)
+    queries = _parse_queries(content, num_queries) or [topic]
     
-    # Clean up the query (remove quotes if present)
-    query = query.strip('"\'')
+    _log("\nLLM Response:", indent=1)
+    _log("\"%s\"", content.strip(), indent=2)
+    _log("\nOutput:", indent=1)
+    for query in queries:
+        _log("- Search query: \"%s\"", query, indent=2)
     
-    _log("\nLLM Response:", 1)
-    _log(f"\"{response.content.strip()}\"", 2)
-    _log("\nOutput:", 1)
-    _log(f"- Search query: \"{query}\"", 2)
+    return {
+        "current_query": queries[0],
+        "sub_queries": queries,
+        "search_results": None  # Start a fresh batch for this iteration
+    }
+
+
+def _parse_queries(text: str, limit: int) -> list[str]:
+    """Parse one query per line, dropping list markers, quotes and repeats."""
+    queries = []
+    for line in text.splitlines():
+        # Clean up the query (remove list markers and quotes if present)
+        query = _LIST_MARKER.sub("", line).strip().strip('"\'')
+        if query and query not in queries:
+            queries.append(query)
+    return queries[:limit]
+
+
+def route_searches(state: ResearchState) -> list[Send]:
+    """
+    Routing function: fan out one search branch per generated query.
     
-    return {"current_query": query}
+    The branches run in parallel; their sources and results are merged by
+    the reducers on ResearchState. Each branch only gets the fields search
+    reads, rather than a copy of the whole state.
+    """
+    queries = state.get("sub_queries") or [state["current_query"]]
+    sources = state.get("sources", [])
+    seen_hashes = state.get("seen_hashes", set())
+    return [
+        Send("search", {"current_query": query, "sources": sources, "seen_hashes": seen_hashes})
+        for query in queries
+    ]
 
 
-def search(state: ResearchState) -> dict:
+async def search(state: ResearchState) -> dict:
     """
     Execute web search using the current query.
-    """
-    _log_section("EXECUTING WEB SEARCH")
     
+    Runs once per query in parallel, so it returns only the sources that are
+    new for this branch; the state reducer appends them to the collection.
+    Results already gathered in earlier iterations, by URL or by content, are
+    left out so summarize doesn't see them again.
+    """
     query = state["current_query"]
     max_results = config.max_search_results if config else 5
     search_depth = config.search_depth if config else "advanced"
     
-    _log("\nTool Call:", 1)
-    _log(f"- Tool: Tavily Search", 2)
-    _log(f"- Query: \"{query}\"", 2)
-    _log(f"- Max Results: {max_results}", 2)
-    _log(f"- Search Depth: {search_depth}", 2)
-    
     try:
-        response = search_client.search(
-            query=query,
-            max_results=max_results,
-            search_depth=search_depth
-        )
+        async def call():
+            return await search_client.search(
+                query=query,
+                max_results=max_results,
+                search_depth=search_depth
+            )
+        
+        # Tavily's latency has a long tail: if this search runs past the
+        # usual p95, a second identical request races it
+        if _search_latency is not None:
+            response = await timed_hedged(call, _search_latency)
+        else:
+            response = await call()
         
         results = response.get("results", [])
         
@@ -182,56 +376,113 @@ def search(state: ResearchState) -> dict:
                 "content": r.get("content", "")
             })
         
-        # Add to existing sources (avoid duplicates by URL)
+        # Only keep sources we don't already have: same URL, or the same
+        # article republished under another URL
         existing_urls = {s["url"] for s in state.get("sources", [])}
-        existing_sources = list(state.get("sources", []))
+        seen_hashes = state.get("seen_hashes", set())
+        added_sources = []
+        added_hashes = set()
         
         for source in new_sources:
-            if source["url"] not in existing_urls:
-                existing_sources.append(source)
-                existing_urls.add(source["url"])
+            content_hash = _content_hash(source["content"])
+            if source["url"] in existing_urls or (
+                content_hash is not None
+                and (content_hash in seen_hashes or content_hash in added_hashes)
+            ):
+                continue
+            added_sources.append(source)
+            existing_urls.add(source["url"])
+            if content_hash is not None:
+                added_hashes.add(content_hash)
         
-        _log(f"\nResults Found ({len(new_sources)}):", 1)
-        for i, r in enumerate(new_sources[:5], 1):
-            _log(f"\n[{i}] {r['title'][:60]}", 2)
-            _log(f"    URL: {r['url']}", 2)
-            _log(f"    Content: {_truncate(r['content'], 100)}", 2)
+        # Parallel branches log after their call so each block stays together
+        _log_search_call(query, max_results, search_depth)
+        _log("\nResults Found (%s):", len(new_sources), indent=1)
+        if _verbose():
+            for i, r in enumerate(islice(new_sources, 5), 1):
+                _log(
+                    "\n[%s] %s\n        URL: %s\n        Content: %s",
+                    i, r["title"][:60], r["url"], truncate_text(r["content"], 100),
+                    indent=2,
+                )
         
-        _log(f"\nOutput:", 1)
-        _log(f"- New sources found: {len(new_sources)}", 2)
-        _log(f"- Total sources collected: {len(existing_sources)}", 2)
+        _log("\nOutput:", indent=1)
+        _log("- New sources found: %s", len(new_sources), indent=2)
+        _log("- Sources added: %s", len(added_sources), indent=2)
         
         return {
-            "sources": existing_sources,
-            "search_results": new_sources  # Renamed: removed underscore so LangGraph persists it
+            "sources": added_sources,
+            "seen_hashes": added_hashes,
+            # Tagged with the query so summarize can group parallel results
+            "search_results": [{**r, "query": query} for r in added_sources]
         }
         
     except Exception as e:
-        _log(f"\nError: {str(e)}", 1)
+        _log_search_call(query, max_results, search_depth)
+        _log("\nError: %s", e, indent=1)
         return {
-            "sources": state.get("sources", []),
+            "sources": [],
             "search_results": []
         }
 
 
-def summarize(state: ResearchState) -> dict:
+def _content_hash(content: str) -> Optional[str]:
+    """
+    Short fingerprint of result content, ignoring case and whitespace.
+    
+    Returns None for empty content, which says nothing about whether two
+    pages are the same article.
+    """
+    normalized = " ".join(content.lower().split())
+    if not normalized:
+        return None
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+
+
+def _log_search_call(query: str, max_results: int, search_depth: str):
+    """Log the header and parameters of a search call."""
+    _log_section("EXECUTING WEB SEARCH")
+    _log("\nTool Call:", indent=1)
+    _log("- Tool: Tavily Search", indent=2)
+    _log("- Query: \"%s\"", query, indent=2)
+    _log("- Max Results: %s", max_results, indent=2)
+    _log("- Search Depth: %s", search_depth, indent=2)
+
+
+async def summarize(state: ResearchState) -> dict:
     """
-    Update the running summary with information from the latest search.
+    Extend the running summary with information from the latest search.
+    
+    When the iteration searched several queries, their results go into one
+    prompt, grouped by query. The LLM writes only a paragraph of new
+    findings, which is appended to the summary, so earlier text (and the
+    prompt prefix built from it) never changes.
     """
     _log_section("SUMMARIZING RESULTS")
     
     topic = state["topic"]
-    running_summary = state.get("running_summary", "") or "No research yet."
+    previous_summary = state.get("running_summary", "")
+    running_summary = previous_summary or EMPTY_SUMMARY
     search_results = state.get("search_results", [])  # Renamed: removed underscore
     
     if not search_results:
-        _log("\nSkipped: No search results to summarize", 1)
-        return {"iteration": state["iteration"] + 1}
-    
-    # Format search results for the prompt
-    results_text = ""
-    for i, r in enumerate(search_results, 1):
-        results_text += f"\n[{i}] {r['title']}\nURL: {r['url']}\n{r['content']}\n"
+        _log("\nSkipped: No search results to summarize", indent=1)
+        # The summary didn't grow this round, which should_continue reads as converged
+        return {"iteration": state["iteration"] + 1, "prev_summary_len": len(previous_summary)}
+    
+    # Group results under the sub-query that found them, so all parallel
+    # searches are summarized in a single LLM call
+    groups = {}
+    for r in search_results:
+        groups.setdefault(r.get("query", ""), []).append(r)
+    
+    if len(groups) > 1:
+        results_text = "".join(
+            f"\n### Results for \"{query}\"\n{_format_results(results, topic)}"
+            for query, results in groups.items()
+        )
+    else:
+        results_text = _format_results(search_results, topic)
     
     prompt = SUMMARIZE_PROMPT.format(
         topic=topic,
@@ -239,26 +490,99 @@ def summarize(state: ResearchState) -> dict:
         search_results=results_text
     )
     
-    _log("\nLLM Call:", 1)
-    _log("- Updating running summary with new information", 2)
-    _log("\nPrompt Sent to LLM:", 1)
-    _log(_truncate(prompt, 300), 2)
+    _log("\nLLM Call:", indent=1)
+    _log("- Summarizing new information for the running summary", indent=2)
+    _log("\nPrompt Sent to LLM:", indent=1)
+    if _verbose():
+        _log("%s", truncate_text(prompt, 300), indent=2)
+    
+    response = await llm.ainvoke(prompt)
+    new_paragraph = response.content.strip()
     
-    response = llm.invoke(prompt)
-    updated_summary = response.content.strip()
+    if not new_paragraph or new_paragraph.upper().startswith(NO_NEW_INFORMATION):
+        updated_summary = previous_summary
+    elif previous_summary:
+        updated_summary = f"{previous_summary}\n\n{new_paragraph}"
+    else:
+        updated_summary = new_paragraph
     
-    _log("\nLLM Response (Updated Summary):", 1)
-    _log(_truncate(updated_summary, 400), 2)
-    _log("\nOutput:", 1)
-    _log(f"- Summary length: {len(updated_summary)} characters", 2)
-    _log(f"- Iteration: {state['iteration'] + 1}", 2)
+    _log("\nLLM Response (New Findings):", indent=1)
+    if _verbose():
+        _log("%s", truncate_text(new_paragraph, 400), indent=2)
+    _log("\nOutput:", indent=1)
+    _log("- Summary length: %s characters", len(updated_summary), indent=2)
+    _log("- Iteration: %s", state['iteration'] + 1, indent=2)
     
     return {
         "running_summary": updated_summary,
+        "prev_summary_len": len(previous_summary),
         "iteration": state["iteration"] + 1
     }
 
 
+def _format_results(results: list[dict], topic: str) -> str:
+    """Format search results for a summarize prompt."""
+    max_chars = config.max_chars_per_source if config else 1500
+    keywords = {w.lower() for w in _KEYWORD.findall(topic)} - _STOPWORDS
+    results_text = ""
+    for i, r in enumerate(results, 1):
+        content = _trim_content(r["content"], keywords, max_chars)
+        results_text += f"\n[{i}] {r['title']}\nURL: {r['url']}\n{content}\n"
+    return results_text
+
+
+def _trim_content(content: str, keywords: set[str], max_chars: int) -> str:
+    """
+    Cut long result content down to max_chars.
+    
+    Sentences that mention a topic keyword are kept first and the rest of
+    the budget is filled with the other sentences in their original order,
+    so the cut drops the least relevant text rather than just the tail.
+    Content that already fits is returned unchanged.
+    """
+    if len(content) <= max_chars:
+        return content
+    relevant, other = [], []
+    for sentence in _SENTENCE_END.split(content):
+        if keywords & {w.lower() for w in _KEYWORD.findall(sentence)}:
+            relevant.append(sentence)
+        else:
+            other.append(sentence)
+    return " ".join(relevant + other)[:max_chars]
+
+
+def _rule_based_decision(state: ResearchState) -> tuple[Optional[str], str]:
+    """
+    Decide whether to continue without the LLM, when a simple rule settles it.
+    
+    Returns the next node and the reason, or (None, "") when the LLM should
+    be asked.
+    """
+    iteration = state["iteration"]
+    max_iterations = state.get("max_iterations", 5)
+    summary_length = len(state.get("running_summary", ""))
+    num_sources = len(state.get("sources", []))
+    growth = summary_length - state.get("prev_summary_len", 0)
+    
+    # Hard stop at max iterations
+    if iteration >= max_iterations:
+        return "write_report", f"Reached max iterations ({iteration}/{max_iterations})"
+    # If we have very little content, continue
+    if summary_length < 200:
+        return "generate_query", f"Summary too short ({summary_length} chars < 200)"
+    # A long enough summary is treated as sufficient
+    if summary_length >= config.min_sufficient_chars:
+        return "write_report", f"Summary is long enough ({summary_length} chars >= {config.min_sufficient_chars})"
+    # Plenty of sources after a few rounds (off unless min_sources is set; one
+    # iteration can already bring parallel_queries * max_search_results)
+    if config.min_sources is not None and num_sources >= config.min_sources and iteration >= config.min_iterations:
+        return "write_report", f"Enough sources ({num_sources} >= {config.min_sources}) after {iteration} iterations"
+    # The last search added little, so research has converged
+    if growth < 200:
+        return "write_report", f"Summary barely grew (+{growth} chars < 200)"
+    return None, ""
+
+
 def reflect(state: ResearchState) -> dict:
     """
     Reflect on current research and decide whether to continue.
@@ -269,49 +593,42 @@ def reflect(state: ResearchState) -> dict:
     max_iterations = state.get("max_iterations", 5)
     running_summary = state.get("running_summary", "")
     
-    _log("\nCurrent State:", 1)
-    _log(f"- Iteration: {iteration}/{max_iterations}", 2)
-    _log(f"- Summary length: {len(running_summary)} characters", 2)
+    _log("\nCurrent State:", indent=1)
+    _log("- Iteration: %s/%s", iteration, max_iterations, indent=2)
+    _log("- Summary length: %s characters", len(running_summary), indent=2)
     
     # Note: actual decision is made in should_continue()
     # This node just logs the state for visibility
     
-    if iteration >= max_iterations:
-        _log("\nDecision Preview:", 1)
-        _log(f"- Will write report (reached max iterations)", 2)
-    elif len(running_summary) < 200:
-        _log("\nDecision Preview:", 1)
-        _log(f"- Will continue (summary too short: {len(running_summary)} < 200 chars)", 2)
+    decision, reason = _rule_based_decision(state)
+    _log("\nDecision Preview:", indent=1)
+    if decision == "write_report":
+        _log("- Will write report (%s)", reason, indent=2)
+    elif decision == "generate_query":
+        _log("- Will continue (%s)", reason, indent=2)
     else:
-        _log("\nDecision Preview:", 1)
-        _log(f"- Will consult LLM to decide", 2)
+        _log("- Will consult LLM to decide", indent=2)
     
     return {}
 
 
-def should_continue(state: ResearchState) -> Literal["generate_query", "write_report"]:
+async def should_continue(state: ResearchState) -> Literal["generate_query", "write_report"]:
     """
     Routing function: decide whether to continue research or write the report.
     """
     iteration = state["iteration"]
     max_iterations = state.get("max_iterations", 5)
     
-    # Hard stop at max iterations
-    if iteration >= max_iterations:
-        _log("\nRouting Decision: write_report", 1)
-        _log(f"- Reason: Reached max iterations ({iteration}/{max_iterations})", 2)
-        return "write_report"
+    # Cheap rules settle most iterations without asking the LLM
+    decision, reason = _rule_based_decision(state)
+    if decision is not None:
+        _log("\nRouting Decision: %s", decision, indent=1)
+        _log("- Reason: %s", reason, indent=2)
+        return decision
     
-    # Get current state
     topic = state["topic"]
     running_summary = state.get("running_summary", "")
     
-    # If we have very little content, continue
-    if len(running_summary) < 200:
-        _log("\nRouting Decision: generate_query", 1)
-        _log(f"- Reason: Summary too short ({len(running_summary)} chars < 200)", 2)
-        return "generate_query"
-    
     # Ask LLM to evaluate
     prompt = REFLECT_PROMPT.format(
         topic=topic,
@@ -320,25 +637,35 @@ def should_continue(state: ResearchState) -> Literal["generate_query", "write_re
         max_iterations=max_iterations
     )
     
-    _log("\nLLM Call (Routing Decision):", 1)
-    _log("- Asking LLM if research is sufficient", 2)
+    _log("\nLLM Call (Routing Decision):", indent=1)
+    _log("- Asking LLM if research is sufficient", indent=2)
     
-    response = llm.invoke(prompt)
-    decision = response.content.strip().upper()
+    # Research states of the same topic, progress and summary size are
+    # treated as equivalent
+    cache_key = (topic, len(running_summary) // 500, iteration, max_iterations)
+    content = _reflect_cache.get(cache_key)
+    if content is None:
+        content = (await router_llm.ainvoke(prompt)).content
+        _cache_put(_reflect_cache, cache_key, content)
+    else:
+        _log("- Reusing cached response", indent=2)
+    # Only the bare word ends research; "Not sufficient" or any other reply
+    # is read as CONTINUE
+    sufficient = content.strip().rstrip(".").upper() == "SUFFICIENT"
     
-    _log(f"\nLLM Response: \"{response.content.strip()}\"", 1)
+    _log("\nLLM Response: \"%s\"", content.strip(), indent=1)
     
-    if "SUFFICIENT" in decision:
-        _log("\nRouting Decision: write_report", 1)
-        _log("- Reason: LLM determined research is sufficient", 2)
+    if sufficient:
+        _log("\nRouting Decision: write_report", indent=1)
+        _log("- Reason: LLM determined research is sufficient", indent=2)
         return "write_report"
     else:
-        _log("\nRouting Decision: generate_query", 1)
-        _log("- Reason: LLM determined more research needed", 2)
+        _log("\nRouting Decision: generate_query", indent=1)
+        _log("- Reason: LLM determined more research needed", indent=2)
         return "generate_query"
 
 
-def write_report(state: ResearchState) -> dict:
+async def write_report(state: ResearchState) -> dict:
     """
     Generate the final research report based on all gathered information.
     """
@@ -348,16 +675,14 @@ def write_report(state: ResearchState) -> dict:
     running_summary = state.get("running_summary", "")
     sources = state.get("sources", [])
     
-    # Format sources for the prompt
-    sources_text = ""
-    unique_urls = []
+    # Format sources for the prompt: first title seen for each URL, in order
+    titles = {}
     for s in sources:
-        if s["url"] not in unique_urls:
-            unique_urls.append(s["url"])
-    
-    for i, url in enumerate(unique_urls[:15], 1):
-        title = next((s["title"] for s in sources if s["url"] == url), "Source")
-        sources_text += f"[{i}] {title}: {url}\n"
+        titles.setdefault(s["url"], s["title"])
+    sources_text = "".join(
+        f"[{i}] {title}: {url}\n"
+        for i, (url, title) in enumerate(islice(titles.items(), 15), 1)
+    )
     
     prompt = WRITE_REPORT_PROMPT.format(
         topic=topic,
@@ -365,18 +690,19 @@ def write_report(state: ResearchState) -> dict:
         sources=sources_text
     )
     
-    _log("\nLLM Call:", 1)
-    _log("- Generating final research report", 2)
-    _log("\nPrompt Sent to LLM:", 1)
-    _log(_truncate(prompt, 400), 2)
-    _log(f"\nSources to cite: {len(unique_urls)}", 1)
+    _log("\nLLM Call:", indent=1)
+    _log("- Generating final research report", indent=2)
+    _log("\nPrompt Sent to LLM:", indent=1)
+    if _verbose():
+        _log("%s", truncate_text(prompt, 400), indent=2)
+    _log("\nSources to cite: %s", len(titles), indent=1)
     
-    response = llm.invoke(prompt)
+    response = await llm.ainvoke(prompt)
     report = response.content.strip()
     
-    _log("\nOutput:", 1)
-    _log(f"- Report length: {len(report)} characters", 2)
-    _log("- Report generated successfully", 2)
+    _log("\nOutput:", indent=1)
+    _log("- Report length: %s characters", len(report), indent=2)
+    _log("- Report generated successfully", indent=2)
     
     return {
         "messages": [AIMessage(content=report)]
@@ -5,10 +5,58 @@ The state tracks all information as the agent progresses through
 the research loop: Topic → Generate Query → Search → Summarize → Reflect → ...
 """
 
+import operator
 from typing import Annotated, TypedDict, Optional
 from langgraph.graph.message import add_messages
 
 
+class Source(TypedDict):
+    """A search result kept for citations."""
+    
+    title: str
+    url: str
+    content: str
+
+
+def merge_sources(left: list[Source], right: list[Source]) -> list[Source]:
+    """
+    Reducer for the gathered sources.
+    
+    Appends only sources whose URL hasn't been seen yet, so parallel search
+    branches that find the same page don't add it twice.
+    """
+    if not right:
+        return left
+    seen = {s["url"] for s in left}
+    merged = list(left)
+    for source in right:
+        if source["url"] not in seen:
+            seen.add(source["url"])
+            merged.append(source)
+    return merged
+
+
+def merge_search_results(left: list[dict], right: Optional[list[dict]]) -> list[dict]:
+    """
+    Reducer for the per-iteration search results.
+    
+    Parallel search branches append their results to the batch, skipping
+    pages another branch already returned; writing None clears it so each
+    iteration only summarizes its own searches.
+    """
+    if right is None:
+        return []
+    if not right:
+        return left
+    seen = {r["url"] for r in left}
+    merged = list(left)
+    for result in right:
+        if result["url"] not in seen:
+            seen.add(result["url"])
+            merged.append(result)
+    return merged
+
+
 class ResearchState(TypedDict):
     """
     The state of our research agent.
@@ -33,15 +81,27 @@ class ResearchState(TypedDict):
     # This is the key to the Local Deep Researcher pattern
     running_summary: str
     
+    # Summary length before the latest update, to see how much it grew
+    prev_summary_len: int
+    
     # All sources gathered (for citations)
-    sources: list[dict]  # [{title, url, content}, ...]
+    # Parallel search branches each append their new sources, deduped by URL
+    sources: Annotated[list[Source], merge_sources]
+    
+    # Content fingerprints of gathered sources, to skip the same article
+    # found again under a different URL
+    seen_hashes: Annotated[set[str], operator.or_]
     
     # Latest search results (temporary, for summarize node)
-    search_results: list[dict]
+    # Merged across the parallel searches of one iteration
+    search_results: Annotated[list[dict], merge_search_results]
     
     # The most recent search query used
     current_query: str
     
+    # Search queries for the current iteration, searched in parallel
+    sub_queries: list[str]
+    
     # Loop control
     iteration: int
     max_iterations: int
\ No newline at end of file
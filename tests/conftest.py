@@ -4,29 +4,65 @@ Pytest fixtures and configuration for tests.
 
 import os
 import pytest
-from unittest.mock import MagicMock, patch
+from types import MappingProxyType
+from unittest.mock import AsyncMock, MagicMock, patch
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage, AIMessage
+from src.agent import nodes
+from src.agent.config import AgentConfig
 
+# Loaded once here for the whole test run; the test modules read the keys
+# from os.environ
 load_dotenv()
 
+# The integration tests call the real APIs, so without both keys there is
+# nothing in that module to run and it isn't collected at all. (Running the
+# file by path still collects it; its own skipif marks handle that.)
+if not (os.getenv("OPENAI_API_KEY") and os.getenv("TAVILY_API_KEY")):
+    collect_ignore = ["test_integration.py"]
 
-# Check for API keys
-HAS_OPENAI_KEY = bool(os.getenv("OPENAI_API_KEY"))
-HAS_TAVILY_KEY = bool(os.getenv("TAVILY_API_KEY"))
-HAS_ALL_KEYS = HAS_OPENAI_KEY and HAS_TAVILY_KEY
 
+def pytest_collection_modifyitems(config, items):
+    """Skip the benchmarks unless pytest-benchmark was run with --benchmark-only."""
+    if config.getoption("benchmark_only", default=False):
+        return
+    skip = pytest.mark.skip(reason="benchmark; run with --benchmark-only")
+    for item in items:
+        if "benchmark" in getattr(item, "fixturenames", ()):
+            item.add_marker(skip)
 
-@pytest.fixture
+
+# Research notes for the state fixture that has already done some research
+SAMPLE_RUNNING_SUMMARY = """
+        Meditation has been extensively studied and shown to provide numerous health benefits.
+        
+        Key findings include:
+        - Reduced stress and anxiety levels through lower cortisol production
+        - Improved focus and concentration abilities
+        - Enhanced emotional regulation and well-being
+        - Better sleep quality and reduced insomnia
+        - Changes in brain structure, including increased gray matter density
+        
+        Research from NIH and other institutions confirms these benefits through brain imaging studies.
+        [Source: https://www.nih.gov/meditation-research]
+        [Source: https://www.healthline.com/meditation-benefits]
+        """
+
+
+# Read-only data fixtures are built once per session. The state fixtures
+# below stay per-test and copy the lists they take from them, so a test
+# that changes its state can't leak into the next one.
+
+@pytest.fixture(scope="session")
 def sample_query():
     """Sample research query for testing."""
     return "What are the benefits of meditation?"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_search_results():
-    """Mock search results for testing."""
-    return [
+    """Mock search results for testing, read-only; copy them to get a list."""
+    return tuple(MappingProxyType(result) for result in [
         {
             "title": "Benefits of Meditation - Healthline",
             "url": "https://www.healthline.com/meditation-benefits",
@@ -52,27 +88,12 @@ def sample_search_results():
             "url": "https://www.verywellmind.com/meditation-types",
             "content": "There are many types of meditation including mindfulness, transcendental, loving-kindness, and body scan meditation. Each type offers unique benefits and suits different preferences."
         }
-    ]
-
-
-@pytest.fixture
-def mock_llm_response():
-    """Mock LLM response object."""
-    mock = MagicMock()
-    mock.content = "meditation health benefits research"
-    return mock
-
-
-@pytest.fixture
-def mock_tavily_response(sample_search_results):
-    """Mock Tavily API response."""
-    return {"results": sample_search_results}
+    ])
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def agent_config():
-    """Test configuration with minimal iterations."""
-    from src.agent.config import AgentConfig
+    """Test configuration with minimal iterations; AgentConfig is frozen, so one is shared."""
     return AgentConfig(
         model_name="gpt-4o-mini",
         max_iterations=2,
@@ -81,27 +102,44 @@ def agent_config():
     )
 
 
-@pytest.fixture
-def sample_state(sample_query):
-    """Sample initial research state."""
+@pytest.fixture(scope="session")
+def initialized_agent(agent_config):
+    """
+    Run init_agent once for the session, with the Tavily client mocked.
+    
+    Returns the module globals it set, so tests can put them back after
+    something else (another init_agent call, a graph test) replaced them.
+    """
+    with patch('src.agent.nodes.AsyncTavilyClient'):
+        nodes.init_agent(agent_config, verbose=False)
     return {
-        "messages": [HumanMessage(content=sample_query)],
-        "topic": "",
-        "running_summary": "",
-        "sources": [],
-        "search_results": [],
-        "current_query": "",
-        "iteration": 0,
-        "max_iterations": 3
+        name: getattr(nodes, name)
+        for name in ("llm", "router_llm", "search_client", "config", "_search_latency")
     }
 
 
 @pytest.fixture
-def sample_state_with_topic(sample_query):
-    """Sample state with topic already extracted."""
+def mock_llm(monkeypatch):
+    """Patch the agent's LLM; tests set mock_llm.ainvoke.return_value."""
+    mock = MagicMock(ainvoke=AsyncMock())
+    monkeypatch.setattr(nodes, "llm", mock)
+    return mock
+
+
+@pytest.fixture
+def mock_router_llm(monkeypatch):
+    """Patch the agent's routing LLM; tests set mock_router_llm.ainvoke.return_value."""
+    mock = MagicMock(ainvoke=AsyncMock())
+    monkeypatch.setattr(nodes, "router_llm", mock)
+    return mock
+
+
+@pytest.fixture(scope="session")
+def _base_state(sample_query):
+    """Initial research state, with its query message validated once."""
     return {
         "messages": [HumanMessage(content=sample_query)],
-        "topic": sample_query,
+        "topic": "",
         "running_summary": "",
         "sources": [],
         "search_results": [],
@@ -111,62 +149,51 @@ def sample_state_with_topic(sample_query):
     }
 
 
-@pytest.fixture
-def sample_state_with_results(sample_query, sample_search_results):
-    """Sample state with search results ready for summarization."""
-    return {
-        "messages": [HumanMessage(content=sample_query)],
-        "topic": sample_query,
-        "running_summary": "",
-        "sources": sample_search_results,
-        "search_results": sample_search_results,
-        "current_query": "meditation health benefits",
-        "iteration": 0,
-        "max_iterations": 3
+def _state_from(base: dict, **changes) -> dict:
+    """Copy the base state with some fields changed, giving it its own lists."""
+    state = {
+        **base,
+        "messages": list(base["messages"]),
+        "sources": list(base["sources"]),
+        "search_results": list(base["search_results"]),
     }
+    state.update(changes)
+    return state
 
 
 @pytest.fixture
-def sample_state_with_summary(sample_query, sample_search_results):
-    """Sample state with existing research summary."""
-    return {
-        "messages": [HumanMessage(content=sample_query)],
-        "topic": sample_query,
-        "running_summary": """
-        Meditation has been extensively studied and shown to provide numerous health benefits.
-        
-        Key findings include:
-        - Reduced stress and anxiety levels through lower cortisol production
-        - Improved focus and concentration abilities
-        - Enhanced emotional regulation and well-being
-        - Better sleep quality and reduced insomnia
-        - Changes in brain structure, including increased gray matter density
-        
-        Research from NIH and other institutions confirms these benefits through brain imaging studies.
-        [Source: https://www.nih.gov/meditation-research]
-        [Source: https://www.healthline.com/meditation-benefits]
-        """,
-        "sources": sample_search_results[:3],
-        "search_results": [],
-        "current_query": "meditation mental health research",
-        "iteration": 2,
-        "max_iterations": 5
-    }
+def sample_state(_base_state):
+    """Sample initial research state."""
+    return _state_from(_base_state)
 
 
 @pytest.fixture
-def mock_openai_client():
-    """Mock OpenAI ChatCompletion client."""
-    mock = MagicMock()
-    mock_response = MagicMock()
-    mock_response.content = "Test response"
-    mock.invoke.return_value = mock_response
-    return mock
+def sample_state_with_topic(_base_state, sample_query):
+    """Sample state with topic already extracted."""
+    return _state_from(_base_state, topic=sample_query)
 
 
 @pytest.fixture
-def mock_tavily_client(mock_tavily_response):
-    """Mock Tavily client."""
-    mock = MagicMock()
-    mock.search.return_value = mock_tavily_response
-    return mock
\ No newline at end of file
+def sample_state_with_results(_base_state, sample_query, sample_search_results):
+    """Sample state with search results ready for summarization."""
+    return _state_from(
+        _base_state,
+        topic=sample_query,
+        sources=list(sample_search_results),
+        search_results=list(sample_search_results),
+        current_query="meditation health benefits",
+    )
+
+
+@pytest.fixture
+def sample_state_with_summary(_base_state, sample_query, sample_search_results):
+    """Sample state with existing research summary."""
+    return _state_from(
+        _base_state,
+        topic=sample_query,
+        running_summary=SAMPLE_RUNNING_SUMMARY,
+        sources=list(sample_search_results[:3]),
+        current_query="meditation mental health research",
+        iteration=2,
+        max_iterations=5,
+    )
@@ -2,10 +2,14 @@
 Tests for AgentConfig and prompts.
 """
 
+import dataclasses
+import string
+
 import pytest
 from src.agent.config import (
     AgentConfig,
     GENERATE_QUERY_PROMPT,
+    GENERATE_SUB_QUERIES_PROMPT,
     SUMMARIZE_PROMPT,
     REFLECT_PROMPT,
     WRITE_REPORT_PROMPT
@@ -24,31 +28,25 @@ class TestAgentConfig:
         assert config.max_iterations == 5
         assert config.max_search_results == 5
         assert config.search_depth == "advanced"
-    
-    def test_custom_model_name(self):
-        """Test setting custom model name."""
-        config = AgentConfig(model_name="gpt-4o")
-        assert config.model_name == "gpt-4o"
-    
-    def test_custom_temperature(self):
-        """Test setting custom temperature."""
-        config = AgentConfig(temperature=0.7)
-        assert config.temperature == 0.7
-    
-    def test_custom_max_iterations(self):
-        """Test setting custom max iterations."""
-        config = AgentConfig(max_iterations=10)
-        assert config.max_iterations == 10
-    
-    def test_custom_max_search_results(self):
-        """Test setting custom max search results."""
-        config = AgentConfig(max_search_results=10)
-        assert config.max_search_results == 10
-    
-    def test_custom_search_depth(self):
-        """Test setting search depth to basic."""
-        config = AgentConfig(search_depth="basic")
-        assert config.search_depth == "basic"
+        assert config.parallel_queries == 3
+        assert config.max_chars_per_source == 1500
+        assert config.search_hedge_delay == 2.0
+        assert config.min_sufficient_chars == 2000
+        assert config.min_sources is None
+        assert config.min_iterations == 2
+        assert config.router_model_name == "gpt-4o-mini"
+    
+    @pytest.mark.parametrize("field,value", [
+        ("model_name", "gpt-4o"),
+        ("temperature", 0.7),
+        ("max_iterations", 10),
+        ("max_search_results", 10),
+        ("search_depth", "basic"),
+    ])
+    def test_custom_value(self, field, value):
+        """Test setting a single field to a custom value."""
+        config = AgentConfig(**{field: value})
+        assert getattr(config, field) == value
     
     def test_api_keys_default_to_none(self):
         """Test that API keys are None by default."""
@@ -83,19 +81,43 @@ class TestAgentConfig:
         assert config.max_iterations == 8
         assert config.max_search_results == 7
         assert config.search_depth == "basic"
+    
+    def test_config_is_immutable(self):
+        """Test that fields can't be reassigned after construction."""
+        config = AgentConfig()
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.max_iterations = 10
+    
+    def test_config_is_hashable(self):
+        """Test that equal configs hash the same."""
+        assert hash(AgentConfig(model_name="gpt-4o")) == hash(AgentConfig(model_name="gpt-4o"))
+        assert not hasattr(AgentConfig(), "__dict__")
+
+
+def _placeholders(prompt: str) -> set[str]:
+    """Return the names of the format fields in a prompt template."""
+    return {field for _, field, _, _ in string.Formatter().parse(prompt) if field}
+
+
+class TestPromptPlaceholders:
+    """Tests that each prompt takes exactly the fields its node fills in."""
+    
+    @pytest.mark.parametrize("prompt,fields", [
+        (GENERATE_QUERY_PROMPT, {"topic", "running_summary"}),
+        (GENERATE_SUB_QUERIES_PROMPT, {"topic", "running_summary", "num_queries"}),
+        (SUMMARIZE_PROMPT, {"topic", "running_summary", "search_results"}),
+        (REFLECT_PROMPT, {"topic", "running_summary", "iteration", "max_iterations"}),
+        (WRITE_REPORT_PROMPT, {"topic", "running_summary", "sources"}),
+    ])
+    def test_has_required_placeholders(self, prompt, fields):
+        """Test that the prompt's placeholders match the node's format call."""
+        assert _placeholders(prompt) == fields
 
 
 class TestGenerateQueryPrompt:
     """Tests for GENERATE_QUERY_PROMPT template."""
     
-    def test_has_topic_placeholder(self):
-        """Test that prompt has topic placeholder."""
-        assert "{topic}" in GENERATE_QUERY_PROMPT
-    
-    def test_has_running_summary_placeholder(self):
-        """Test that prompt has running_summary placeholder."""
-        assert "{running_summary}" in GENERATE_QUERY_PROMPT
-    
     def test_formats_correctly(self):
         """Test that prompt formats without errors."""
         formatted = GENERATE_QUERY_PROMPT.format(
@@ -117,15 +139,24 @@ class TestGenerateQueryPrompt:
         assert "No research yet." in formatted
 
 
+class TestGenerateSubQueriesPrompt:
+    """Tests for GENERATE_SUB_QUERIES_PROMPT template."""
+    
+    def test_formats_correctly(self):
+        """Test that prompt formats without errors."""
+        formatted = GENERATE_SUB_QUERIES_PROMPT.format(
+            topic="quantum computing",
+            running_summary="Some existing research notes",
+            num_queries=3
+        )
+        
+        assert "quantum computing" in formatted
+        assert "generate 3 search queries" in formatted
+
+
 class TestSummarizePrompt:
     """Tests for SUMMARIZE_PROMPT template."""
     
-    def test_has_required_placeholders(self):
-        """Test that prompt has all required placeholders."""
-        assert "{topic}" in SUMMARIZE_PROMPT
-        assert "{running_summary}" in SUMMARIZE_PROMPT
-        assert "{search_results}" in SUMMARIZE_PROMPT
-    
     def test_formats_correctly(self):
         """Test that prompt formats without errors."""
         formatted = SUMMARIZE_PROMPT.format(
@@ -142,13 +173,6 @@ class TestSummarizePrompt:
 class TestReflectPrompt:
     """Tests for REFLECT_PROMPT template."""
     
-    def test_has_required_placeholders(self):
-        """Test that prompt has all required placeholders."""
-        assert "{topic}" in REFLECT_PROMPT
-        assert "{running_summary}" in REFLECT_PROMPT
-        assert "{iteration}" in REFLECT_PROMPT
-        assert "{max_iterations}" in REFLECT_PROMPT
-    
     def test_formats_correctly(self):
         """Test that prompt formats without errors."""
         formatted = REFLECT_PROMPT.format(
@@ -172,12 +196,6 @@ class TestReflectPrompt:
 class TestWriteReportPrompt:
     """Tests for WRITE_REPORT_PROMPT template."""
     
-    def test_has_required_placeholders(self):
-        """Test that prompt has all required placeholders."""
-        assert "{topic}" in WRITE_REPORT_PROMPT
-        assert "{running_summary}" in WRITE_REPORT_PROMPT
-        assert "{sources}" in WRITE_REPORT_PROMPT
-    
     def test_formats_correctly(self):
         """Test that prompt formats without errors."""
         formatted = WRITE_REPORT_PROMPT.format(
@@ -195,4 +213,22 @@ class TestWriteReportPrompt:
         prompt_lower = WRITE_REPORT_PROMPT.lower()
         assert "introduction" in prompt_lower
         assert "conclusion" in prompt_lower
-        assert "source" in prompt_lower
\ No newline at end of file
+        assert "source" in prompt_lower
+
+
+class TestPromptLayout:
+    """Tests that prompts keep their static text ahead of per-call values."""
+    
+    @pytest.mark.parametrize("prompt", [
+        GENERATE_QUERY_PROMPT,
+        GENERATE_SUB_QUERIES_PROMPT,
+        SUMMARIZE_PROMPT,
+        REFLECT_PROMPT,
+        WRITE_REPORT_PROMPT,
+    ])
+    def test_instructions_precede_dynamic_fields(self, prompt):
+        """Test that the topic comes after the instructions and before the summary."""
+        topic_at = prompt.index("{topic}")
+        
+        assert topic_at > len(prompt) // 2
+        assert topic_at < prompt.index("{running_summary}")
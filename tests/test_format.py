@@ -0,0 +1,32 @@
+"""
+Tests for the text formatting helpers.
+"""
+
+from src.agent._format import truncate_text
+
+
+class TestTruncateText:
+    """Tests for truncate_text helper."""
+    
+    def test_empty_text(self):
+        """Test that empty text is shown as a placeholder."""
+        assert truncate_text("") == "(empty)"
+        assert truncate_text(None) == "(empty)"
+    
+    def test_short_text_unchanged(self):
+        """Test that text within the limit is returned as is."""
+        assert truncate_text("short text", 20) == "short text"
+    
+    def test_long_text_truncated(self):
+        """Test that long text is cut to the limit with an ellipsis."""
+        assert truncate_text("abcdefghij", 4) == "abcd..."
+    
+    def test_normalizes_whitespace(self):
+        """Test that runs of whitespace collapse to single spaces."""
+        assert truncate_text("multi\n  line\ttext", 50) == "multi line text"
+    
+    def test_whitespace_runs_past_prefix(self):
+        """Test that long whitespace runs don't cut the result short."""
+        text = "a" + " " * 50 + "b" + "\n" * 50 + "cdef"
+        assert truncate_text(text, 5) == "a b c..."
+        assert truncate_text(text, 50) == "a b cdef"
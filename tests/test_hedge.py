@@ -0,0 +1,132 @@
+"""
+Tests for hedged requests.
+"""
+
+import asyncio
+
+import pytest
+from src.agent._hedge import LatencyTracker, hedged, timed_hedged
+
+
+class TestHedged:
+    """Tests for hedged."""
+    
+    async def test_fast_call_is_not_hedged(self):
+        """Test that a call finishing before the delay runs once."""
+        calls = []
+        
+        async def call():
+            calls.append(1)
+            return "ok"
+        
+        assert await hedged(call, 1.0) == "ok"
+        assert len(calls) == 1
+    
+    async def test_slow_call_is_raced_by_a_backup(self):
+        """Test that a backup call starts after the delay and can win."""
+        delays = [10.0, 0.0]
+        
+        async def call():
+            delay = delays.pop(0)
+            await asyncio.sleep(delay)
+            return delay
+        
+        assert await asyncio.wait_for(hedged(call, 0.01), timeout=1) == 0.0
+    
+    async def test_error_falls_back_to_other_call(self):
+        """Test that one failed call doesn't fail the request."""
+        attempts = []
+        
+        async def call():
+            attempts.append(1)
+            if len(attempts) == 1:
+                await asyncio.sleep(0.02)
+                raise ConnectionError("boom")
+            await asyncio.sleep(0.05)
+            return "backup"
+        
+        assert await hedged(call, 0.01) == "backup"
+    
+    async def test_raises_when_every_call_fails(self):
+        """Test that the error is raised if no call succeeds."""
+        async def call():
+            raise ConnectionError("boom")
+        
+        with pytest.raises(ConnectionError):
+            await hedged(call, 0.01)
+    
+    async def test_early_error_starts_backup(self):
+        """Test that a call failing before the delay is retried by the backup."""
+        attempts = []
+        
+        async def call():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError("boom")
+            return "backup"
+        
+        assert await hedged(call, 10.0) == "backup"
+        assert len(attempts) == 2
+
+
+class TestLatencyTracker:
+    """Tests for LatencyTracker."""
+    
+    def test_uses_default_without_samples(self):
+        """Test that the default delay is used before any call finishes."""
+        assert LatencyTracker(2.0).p95 == 2.0
+    
+    def test_follows_observed_latency(self):
+        """Test that the estimate tracks recorded latencies."""
+        tracker = LatencyTracker(2.0)
+        for seconds in [0.5, 0.6, 0.4, 0.5, 0.5] * 2:
+            tracker.record(seconds)
+        
+        assert 0.5 < tracker.p95 < 1.0
+    
+    def test_uses_default_while_warming_up(self):
+        """Test that a few early samples don't replace the default."""
+        tracker = LatencyTracker(2.0, min_samples=10)
+        for _ in range(9):
+            tracker.record(0.5)
+        
+        assert tracker.p95 == 2.0
+        
+        tracker.record(0.5)
+        assert tracker.p95 < 2.0
+    
+    def test_forgets_old_latencies(self):
+        """Test that the estimate follows the service once it slows down."""
+        tracker = LatencyTracker(2.0, window=20)
+        for seconds in [0.5] * 20 + [3.0] * 20:
+            tracker.record(seconds)
+        
+        assert tracker.p95 == 3.0
+
+
+class TestTimedHedged:
+    """Tests for timed_hedged."""
+    
+    async def test_records_first_call_when_backup_wins(self):
+        """Test that a winning backup doesn't pull the recorded latency below the delay."""
+        delays = [10.0, 0.0]
+        tracker = LatencyTracker(0.05, min_samples=1, floor=0)
+        
+        async def call():
+            await asyncio.sleep(delays.pop(0))
+            return "ok"
+        
+        assert await timed_hedged(call, tracker) == "ok"
+        assert tracker.p95 >= 0.05
+    
+    async def test_records_first_call_when_it_wins(self):
+        """Test that the first call's own latency is recorded when it wins."""
+        delays = [0.05, 10.0]
+        tracker = LatencyTracker(0.01, min_samples=1, floor=0)
+        
+        async def call():
+            await asyncio.sleep(delays.pop(0))
+            return "ok"
+        
+        assert await timed_hedged(call, tracker) == "ok"
+        assert 0.05 <= tracker.p95 < 1.0
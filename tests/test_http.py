@@ -0,0 +1,64 @@
+"""
+Tests for the shared HTTP connection pooling.
+"""
+
+import asyncio
+
+import httpx
+from src.agent._http import PerLoopTransport
+
+
+class TestPerLoopTransport:
+    """Tests for PerLoopTransport."""
+    
+    async def test_reuses_pool_within_a_loop(self):
+        """Test that requests on one event loop share a connection pool."""
+        transport = PerLoopTransport()
+        
+        assert transport._pool() is transport._pool()
+        assert isinstance(transport._pool(), httpx.AsyncHTTPTransport)
+    
+    def test_new_pool_per_event_loop(self):
+        """Test that each event loop gets its own connection pool."""
+        transport = PerLoopTransport()
+        
+        async def get_pool():
+            return transport._pool()
+        
+        first = asyncio.run(get_pool())
+        second = asyncio.run(get_pool())
+        
+        assert first is not second
+    
+    async def test_aclose_drops_pool(self):
+        """Test that closing releases the running loop's pool."""
+        transport = PerLoopTransport()
+        pool = transport._pool()
+        
+        await transport.aclose()
+        
+        assert transport._pool() is not pool
+    
+    def test_session_releases_pool_after_each_run(self):
+        """Test that repeated asyncio.run calls don't leave pools behind."""
+        transport = PerLoopTransport()
+        
+        async def run():
+            async with transport.session():
+                transport._pool()
+        
+        for _ in range(5):
+            asyncio.run(run())
+        
+        assert len(transport._pools) == 0
+    
+    async def test_concurrent_sessions_share_pool(self):
+        """Test that the pool stays open until the last session on the loop ends."""
+        transport = PerLoopTransport()
+        
+        async with transport.session():
+            async with transport.session():
+                pool = transport._pool()
+            assert transport._pool() is pool
+        
+        assert len(transport._pools) == 0
@@ -3,17 +3,18 @@ Integration tests for the Deep Research Agent.
 
 These tests require valid API keys and make real API calls.
 Run with: pytest tests/test_integration.py -v
+In parallel: pytest tests/test_integration.py -n auto --dist loadscope --timeout 120
 
 To skip these tests: pytest -m "not integration"
 """
 
 import os
 import pytest
-from dotenv import load_dotenv
+from langchain_core.messages import HumanMessage, AIMessage
+from src.agent import run_research, get_report, AgentConfig
+from src.agent.graph import create_graph, run_research_with_graph
 
-load_dotenv()
-
-# Check if API keys are available
+# Check if API keys are available (conftest.py has already loaded .env)
 HAS_OPENAI_KEY = bool(os.getenv("OPENAI_API_KEY"))
 HAS_TAVILY_KEY = bool(os.getenv("TAVILY_API_KEY"))
 HAS_ALL_KEYS = HAS_OPENAI_KEY and HAS_TAVILY_KEY
@@ -21,38 +22,48 @@ HAS_ALL_KEYS = HAS_OPENAI_KEY and HAS_TAVILY_KEY
 # Skip reason message
 SKIP_REASON = "API keys not available (OPENAI_API_KEY and TAVILY_API_KEY required)"
 
+ML_QUERY = "What is machine learning?"
+ML_CONFIG = AgentConfig(max_iterations=2, max_search_results=3)
+
+
+# Each real research run is shared by the tests that inspect it, so a topic
+# costs one pipeline run rather than one per assertion.
+
+@pytest.fixture(scope="module")
+def ml_research():
+    """Final state of a research run on machine learning."""
+    return run_research(ML_QUERY, ML_CONFIG)
+
+
+@pytest.fixture(scope="module")
+def exercise_report():
+    """Report from a research run on exercise."""
+    config = AgentConfig(max_iterations=2, max_search_results=3)
+    return get_report(run_research("Benefits of regular exercise", config))
+
+
+@pytest.fixture(scope="module")
+def healthcare_ai_report():
+    """Report from a research run on AI in healthcare."""
+    config = AgentConfig(max_iterations=2)
+    return get_report(run_research("artificial intelligence in healthcare", config))
+
 
 @pytest.mark.integration
 @pytest.mark.skipif(not HAS_ALL_KEYS, reason=SKIP_REASON)
 class TestEndToEndResearch:
     """End-to-end tests with real API calls."""
     
-    def test_simple_query_produces_report(self):
+    def test_simple_query_produces_report(self, ml_research):
         """Test that a simple query produces a report."""
-        from src.agent import run_research, get_report, AgentConfig
-        
-        config = AgentConfig(
-            max_iterations=2,
-            max_search_results=3
-        )
-        
-        result = run_research("What is machine learning?", config)
-        report = get_report(result)
+        report = get_report(ml_research)
         
         assert len(report) > 200, "Report should be substantial"
         assert "machine learning" in report.lower() or "ML" in report
     
-    def test_report_mentions_sources(self):
+    def test_report_mentions_sources(self, exercise_report):
         """Test that the report includes source references."""
-        from src.agent import run_research, get_report, AgentConfig
-        
-        config = AgentConfig(
-            max_iterations=2,
-            max_search_results=3
-        )
-        
-        result = run_research("Benefits of regular exercise", config)
-        report = get_report(result)
+        report = exercise_report
         
         # Report should reference sources somehow
         has_sources = (
@@ -62,16 +73,9 @@ class TestEndToEndResearch:
         )
         assert has_sources, "Report should mention sources"
     
-    def test_state_contains_gathered_sources(self):
+    def test_state_contains_gathered_sources(self, ml_research):
         """Test that final state contains gathered sources."""
-        from src.agent import run_research, AgentConfig
-        
-        config = AgentConfig(
-            max_iterations=2,
-            max_search_results=3
-        )
-        
-        result = run_research("Climate change effects", config)
+        result = ml_research
         
         assert "sources" in result
         assert len(result["sources"]) > 0, "Should have gathered at least one source"
@@ -82,33 +86,14 @@ class TestEndToEndResearch:
             assert "url" in source
             assert "content" in source
     
-    def test_iteration_count_respects_max(self):
+    def test_iteration_count_respects_max(self, ml_research):
         """Test that iterations don't exceed max_iterations."""
-        from src.agent import run_research, AgentConfig
-        
-        config = AgentConfig(
-            max_iterations=3,
-            max_search_results=2
-        )
-        
-        result = run_research("History of the internet", config)
-        
-        assert result["iteration"] <= config.max_iterations
+        assert ml_research["iteration"] <= ML_CONFIG.max_iterations
     
-    def test_messages_contains_query_and_report(self):
+    def test_messages_contains_query_and_report(self, ml_research):
         """Test that messages field has both input query and output report."""
-        from src.agent import run_research, AgentConfig
-        from langchain_core.messages import HumanMessage, AIMessage
-        
-        config = AgentConfig(
-            max_iterations=2,
-            max_search_results=2
-        )
-        
-        query = "What is blockchain technology?"
-        result = run_research(query, config)
-        
-        messages = result["messages"]
+        query = ML_QUERY
+        messages = ml_research["messages"]
         
         # Should have at least 2 messages
         assert len(messages) >= 2, "Should have query and report"
@@ -129,8 +114,6 @@ class TestReportQuality:
     
     def test_report_has_structure(self):
         """Test that report has headers or sections."""
-        from src.agent import run_research, get_report, AgentConfig
-        
         config = AgentConfig(max_iterations=3)
         
         result = run_research("Solar energy advantages and disadvantages", config)
@@ -145,17 +128,9 @@ class TestReportQuality:
         )
         assert has_structure, "Report should have discernible structure"
     
-    def test_report_addresses_topic(self):
+    def test_report_addresses_topic(self, healthcare_ai_report):
         """Test that report actually addresses the research topic."""
-        from src.agent import run_research, get_report, AgentConfig
-        
-        config = AgentConfig(max_iterations=2)
-        
-        topic = "artificial intelligence in healthcare"
-        result = run_research(topic, config)
-        report = get_report(result)
-        
-        report_lower = report.lower()
+        report_lower = healthcare_ai_report.lower()
         
         # Should mention key terms from the topic
         mentions_ai = "ai" in report_lower or "artificial intelligence" in report_lower
@@ -166,8 +141,6 @@ class TestReportQuality:
     
     def test_report_has_conclusion(self):
         """Test that report has some form of conclusion."""
-        from src.agent import run_research, get_report, AgentConfig
-        
         config = AgentConfig(max_iterations=3)
         
         result = run_research("Electric vehicles environmental impact", config)
@@ -192,8 +165,6 @@ class TestEdgeCases:
     
     def test_handles_short_query(self):
         """Test handling of very short queries."""
-        from src.agent import run_research, get_report, AgentConfig
-        
         config = AgentConfig(max_iterations=2)
         
         result = run_research("Python", config)
@@ -203,8 +174,6 @@ class TestEdgeCases:
     
     def test_handles_question_format(self):
         """Test handling of question-formatted queries."""
-        from src.agent import run_research, get_report, AgentConfig
-        
         config = AgentConfig(max_iterations=2)
         
         result = run_research("What are the benefits of meditation?", config)
@@ -215,8 +184,6 @@ class TestEdgeCases:
     
     def test_handles_complex_query(self):
         """Test handling of complex multi-part queries."""
-        from src.agent import run_research, get_report, AgentConfig
-        
         config = AgentConfig(max_iterations=3)
         
         query = "Compare renewable and non-renewable energy sources in terms of cost and environmental impact"
@@ -237,28 +204,14 @@ class TestVerboseMode:
     
     def test_verbose_mode_runs_without_error(self, capsys):
         """Test that verbose mode executes without errors."""
-        from src.agent.graph import create_graph
-        from src.agent.config import AgentConfig
-        from langchain_core.messages import HumanMessage
-        
         config = AgentConfig(max_iterations=1, max_search_results=2)
         
         # Create graph with verbose=True
         graph = create_graph(config, verbose=True)
         
-        initial_state = {
-            "messages": [HumanMessage(content="What is Python?")],
-            "topic": "",
-            "running_summary": "",
-            "sources": [],
-            "search_results": [],
-            "current_query": "",
-            "iteration": 0,
-            "max_iterations": 1
-        }
-        
-        # Should complete without error
-        result = graph.invoke(initial_state)
+        # Should complete without error (the nodes are async, so the graph
+        # is run through the helper rather than graph.invoke)
+        result = run_research_with_graph(graph, "What is Python?", config)
         
         assert "messages" in result
         
@@ -3,173 +3,175 @@ Tests for node functions.
 """
 
 import pytest
-from unittest.mock import MagicMock, patch
+from dataclasses import replace
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
 from langchain_core.messages import HumanMessage, AIMessage
+from src.agent import nodes
+from src.agent.nodes import (
+    generate_query,
+    init_agent,
+    initialize_state,
+    route_searches,
+    search,
+    should_continue,
+    summarize,
+    write_report,
+)
+
+
+@pytest.fixture(autouse=True)
+def _agent(initialized_agent, monkeypatch):
+    """Start each test from the session's initialized agent, quiet and with empty caches."""
+    for name, value in initialized_agent.items():
+        monkeypatch.setattr(nodes, name, value)
+    nodes._configure_logging(False)
+    nodes._query_cache.clear()
+    nodes._reflect_cache.clear()
 
 
 class TestInitializeState:
     """Tests for initialize_state node."""
     
-    def test_extracts_topic_from_human_message(self, sample_state, agent_config):
-        """Test that topic is extracted from HumanMessage."""
-        from src.agent.nodes import initialize_state, init_agent
-        
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
-        
+    def test_initial_fields(self, sample_state, agent_config):
+        """Test the topic from the HumanMessage, empty research and config limits."""
         result = initialize_state(sample_state)
         
-        assert "topic" in result
         assert result["topic"] == "What are the benefits of meditation?"
-    
-    def test_initializes_empty_summary(self, sample_state, agent_config):
-        """Test that running_summary starts empty."""
-        from src.agent.nodes import initialize_state, init_agent
-        
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
-        
-        result = initialize_state(sample_state)
-        
         assert result["running_summary"] == ""
-    
-    def test_initializes_empty_sources(self, sample_state, agent_config):
-        """Test that sources list starts empty."""
-        from src.agent.nodes import initialize_state, init_agent
-        
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
-        
-        result = initialize_state(sample_state)
-        
         assert result["sources"] == []
-    
-    def test_initializes_iteration_to_zero(self, sample_state, agent_config):
-        """Test that iteration counter starts at zero."""
-        from src.agent.nodes import initialize_state, init_agent
-        
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
-        
-        result = initialize_state(sample_state)
-        
         assert result["iteration"] == 0
+        assert result["max_iterations"] == agent_config.max_iterations
     
-    def test_sets_max_iterations_from_config(self, sample_state, agent_config):
-        """Test that max_iterations comes from config."""
-        from src.agent.nodes import initialize_state, init_agent
+    def test_verbose_mode_logs_to_stdout(self, sample_state, agent_config, capsys, monkeypatch):
+        """Test that verbose mode shows node output on stdout."""
+        monkeypatch.setattr(nodes, "AsyncTavilyClient", MagicMock())
+        init_agent(agent_config, verbose=True)
         
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
+        initialize_state(sample_state)
         
-        result = initialize_state(sample_state)
+        out = capsys.readouterr().out
+        assert "[NODE] INITIALIZING RESEARCH STATE" in out
+        assert '    - Topic: "What are the benefits of meditation?"' in out
+    
+    def test_quiet_mode_logs_nothing(self, sample_state, capsys):
+        """Test that nothing is shown when verbose mode is off."""
+        initialize_state(sample_state)
         
-        assert result["max_iterations"] == agent_config.max_iterations
+        assert capsys.readouterr().out == ""
 
 
 class TestGenerateQuery:
     """Tests for generate_query node."""
     
-    def test_generates_query_string(self, sample_state_with_topic, agent_config):
+    async def test_generates_query_string(self, sample_state_with_topic, mock_llm):
         """Test that a query string is generated."""
-        from src.agent.nodes import generate_query, init_agent
-        
-        mock_response = MagicMock()
-        mock_response.content = "meditation health benefits"
-        
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
-        
-        with patch('src.agent.nodes.llm') as mock_llm:
-            mock_llm.invoke.return_value = mock_response
-            result = generate_query(sample_state_with_topic)
+        mock_llm.ainvoke.return_value = SimpleNamespace(content="meditation health benefits")
+        result = await generate_query(sample_state_with_topic)
         
         assert "current_query" in result
         assert isinstance(result["current_query"], str)
         assert len(result["current_query"]) > 0
     
-    def test_strips_quotes_from_query(self, sample_state_with_topic, agent_config):
-        """Test that quotes are removed from generated query."""
-        from src.agent.nodes import generate_query, init_agent
+    @pytest.mark.parametrize("reply", [
+        '"meditation benefits research"',
+        "'meditation benefits research'",
+    ], ids=["double_quotes", "single_quotes"])
+    async def test_strips_quotes_from_query(self, sample_state_with_topic, mock_llm, reply):
+        """Test that double or single quotes are removed from the generated query."""
+        mock_llm.ainvoke.return_value = SimpleNamespace(content=reply)
+        result = await generate_query(sample_state_with_topic)
         
-        mock_response = MagicMock()
-        mock_response.content = '"meditation benefits research"'
+        assert result["current_query"] == "meditation benefits research"
+    
+    async def test_generates_parallel_sub_queries(self, sample_state_with_topic, mock_llm):
+        """Test that one query per line is returned, capped at parallel_queries."""
+        mock_llm.ainvoke.return_value = SimpleNamespace(content='1. meditation stress\n2. "meditation sleep"\n- meditation focus\n- meditation pain')
+        result = await generate_query(sample_state_with_topic)
+        
+        assert result["sub_queries"] == [
+            "meditation stress",
+            "meditation sleep",
+            "meditation focus",
+        ]
+        assert result["current_query"] == "meditation stress"
+    
+    async def test_resets_search_results_batch(self, sample_state_with_topic, mock_llm):
+        """Test that a new iteration clears the previous search results."""
+        mock_llm.ainvoke.return_value = SimpleNamespace(content="meditation benefits")
+        result = await generate_query(sample_state_with_topic)
         
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
+        assert result["search_results"] is None
+    
+    async def test_reuses_cached_queries_for_same_state(self, sample_state_with_topic, agent_config, mock_llm, monkeypatch):
+        """Test that the same topic and summary don't call the LLM twice until re-init."""
+        mock_llm.ainvoke.return_value = SimpleNamespace(content="meditation health benefits")
+        first = await generate_query(sample_state_with_topic)
+        second = await generate_query(sample_state_with_topic)
+        
+        assert second == first
+        assert mock_llm.ainvoke.await_count == 1
+        
+        # init_agent clears the cache and builds a new LLM; put the mock back
+        monkeypatch.setattr(nodes, "AsyncTavilyClient", MagicMock())
+        init_agent(agent_config, verbose=False)
+        monkeypatch.setattr(nodes, "llm", mock_llm)
+        await generate_query(sample_state_with_topic)
+        
+        assert mock_llm.ainvoke.await_count == 2
+
+
+class TestRouteSearches:
+    """Tests for route_searches fan-out function."""
+    
+    def test_sends_one_search_per_sub_query(self, sample_state_with_topic):
+        """Test that each sub-query gets its own search branch."""
+        state = {**sample_state_with_topic, "sub_queries": ["a", "b", "c"]}
         
-        with patch('src.agent.nodes.llm') as mock_llm:
-            mock_llm.invoke.return_value = mock_response
-            result = generate_query(sample_state_with_topic)
+        sends = route_searches(state)
         
-        assert result["current_query"] == "meditation benefits research"
-        assert '"' not in result["current_query"]
+        assert [send.node for send in sends] == ["search"] * 3
+        assert [send.arg["current_query"] for send in sends] == ["a", "b", "c"]
     
-    def test_strips_single_quotes(self, sample_state_with_topic, agent_config):
-        """Test that single quotes are also removed."""
-        from src.agent.nodes import generate_query, init_agent
+    def test_falls_back_to_current_query(self, sample_state_with_topic):
+        """Test that a state without sub-queries searches the current query."""
+        state = {**sample_state_with_topic, "current_query": "meditation"}
         
-        mock_response = MagicMock()
-        mock_response.content = "'meditation mental health'"
+        sends = route_searches(state)
         
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
+        assert len(sends) == 1
+        assert sends[0].arg["current_query"] == "meditation"
+    
+    def test_sends_only_fields_search_reads(self, sample_state_with_topic):
+        """Test that branches get the query and dedupe fields, not the whole state."""
+        state = {**sample_state_with_topic, "sub_queries": ["a"], "seen_hashes": {"abc"}}
         
-        with patch('src.agent.nodes.llm') as mock_llm:
-            mock_llm.invoke.return_value = mock_response
-            result = generate_query(sample_state_with_topic)
+        sends = route_searches(state)
         
-        assert "'" not in result["current_query"]
+        assert set(sends[0].arg) == {"current_query", "sources", "seen_hashes"}
+        assert sends[0].arg["seen_hashes"] == {"abc"}
 
 
 class TestSearch:
     """Tests for search node."""
     
-    def test_returns_sources(self, sample_state_with_topic, agent_config, sample_search_results):
-        """Test that search returns sources."""
-        from src.agent.nodes import search, init_agent
-        
+    async def test_populates_sources_and_search_results(self, sample_query, sample_search_results, monkeypatch):
+        """Test that one search fills both sources and the search_results batch for summarize."""
         mock_tavily = MagicMock()
-        mock_tavily.search.return_value = {"results": sample_search_results}
-        
-        with patch('src.agent.nodes.TavilyClient', return_value=mock_tavily):
-            init_agent(agent_config, verbose=False)
-        
-        state = {**sample_state_with_topic, "current_query": "meditation benefits"}
+        mock_tavily.search = AsyncMock(return_value={"results": sample_search_results})
+        state = {"topic": sample_query, "current_query": "meditation benefits", "sources": []}
         
-        with patch('src.agent.nodes.search_client', mock_tavily):
-            result = search(state)
+        monkeypatch.setattr(nodes, "search_client", mock_tavily)
+        result = await search(state)
         
-        assert "sources" in result
         assert len(result["sources"]) > 0
-    
-    def test_returns_search_results_for_summarize(self, sample_state_with_topic, agent_config, sample_search_results):
-        """Test that search_results is populated for summarize node."""
-        from src.agent.nodes import search, init_agent
-        
-        mock_tavily = MagicMock()
-        mock_tavily.search.return_value = {"results": sample_search_results}
-        
-        with patch('src.agent.nodes.TavilyClient', return_value=mock_tavily):
-            init_agent(agent_config, verbose=False)
-        
-        state = {**sample_state_with_topic, "current_query": "meditation benefits"}
-        
-        with patch('src.agent.nodes.search_client', mock_tavily):
-            result = search(state)
-        
-        assert "search_results" in result
         assert len(result["search_results"]) > 0
+        assert all(r["query"] == "meditation benefits" for r in result["search_results"])
     
-    def test_avoids_duplicate_urls(self, sample_state_with_topic, agent_config, sample_search_results):
+    async def test_avoids_duplicate_urls(self, sample_state_with_topic, sample_search_results, monkeypatch):
         """Test that duplicate URLs are not added to sources."""
-        from src.agent.nodes import search, init_agent
-        
         mock_tavily = MagicMock()
-        mock_tavily.search.return_value = {"results": sample_search_results}
-        
-        with patch('src.agent.nodes.TavilyClient', return_value=mock_tavily):
-            init_agent(agent_config, verbose=False)
+        mock_tavily.search = AsyncMock(return_value={"results": sample_search_results})
         
         # Pre-populate with one existing source
         existing_source = sample_search_results[0]
@@ -179,26 +181,77 @@ class TestSearch:
             "sources": [existing_source]
         }
         
-        with patch('src.agent.nodes.search_client', mock_tavily):
-            result = search(state)
+        monkeypatch.setattr(nodes, "search_client", mock_tavily)
+        result = await search(state)
         
         urls = [s["url"] for s in result["sources"]]
         assert len(urls) == len(set(urls)), "Duplicate URLs found in sources"
+        assert existing_source["url"] not in urls
     
-    def test_handles_search_error_gracefully(self, sample_state_with_topic, agent_config):
-        """Test that search errors are handled gracefully."""
-        from src.agent.nodes import search, init_agent
+    async def test_skips_known_results_for_summarize(self, sample_state_with_topic, sample_search_results, monkeypatch):
+        """Test that results from earlier iterations aren't passed to summarize again."""
+        mock_tavily = MagicMock()
+        mock_tavily.search = AsyncMock(return_value={"results": sample_search_results})
+        
+        existing_source = sample_search_results[0]
+        state = {
+            **sample_state_with_topic,
+            "current_query": "meditation benefits",
+            "sources": [existing_source]
+        }
+        
+        monkeypatch.setattr(nodes, "search_client", mock_tavily)
+        result = await search(state)
+        
+        urls = [r["url"] for r in result["search_results"]]
+        assert existing_source["url"] not in urls
+        assert len(urls) == len(sample_search_results) - 1
+    
+    async def test_skips_republished_content(self, sample_state_with_topic, sample_search_results, monkeypatch):
+        """Test that the same content under a new URL is treated as already seen."""
+        mock_tavily = MagicMock()
+        mock_tavily.search = AsyncMock(return_value={"results": sample_search_results})
+        
+        monkeypatch.setattr(nodes, "search_client", mock_tavily)
+        first = await search({**sample_state_with_topic, "current_query": "meditation"})
         
+        republished = [{**r, "url": r["url"] + "?mirror"} for r in sample_search_results]
+        mock_tavily.search = AsyncMock(return_value={"results": republished})
+        second = await search({
+            **sample_state_with_topic,
+            "current_query": "meditation",
+            "sources": first["sources"],
+            "seen_hashes": first["seen_hashes"],
+        })
+        
+        assert len(first["seen_hashes"]) == len(sample_search_results)
+        assert second["sources"] == []
+        assert second["search_results"] == []
+    
+    async def test_keeps_results_with_empty_content(self, sample_state_with_topic, monkeypatch):
+        """Test that pages without content aren't treated as copies of each other."""
         mock_tavily = MagicMock()
-        mock_tavily.search.side_effect = Exception("API Error")
+        mock_tavily.search = AsyncMock(return_value={"results": [
+            {"title": "A", "url": "http://a.com", "content": ""},
+            {"title": "B", "url": "http://b.com", "content": "   "},
+            {"title": "C", "url": "http://c.com", "content": ""},
+        ]})
         
-        with patch('src.agent.nodes.TavilyClient', return_value=mock_tavily):
-            init_agent(agent_config, verbose=False)
+        monkeypatch.setattr(nodes, "search_client", mock_tavily)
+        result = await search({**sample_state_with_topic, "current_query": "meditation"})
+        
+        assert [s["url"] for s in result["sources"]] == ["http://a.com", "http://b.com", "http://c.com"]
+        assert result["seen_hashes"] == set()
+    
+    async def test_handles_search_error_gracefully(self, sample_state_with_topic, monkeypatch):
+        """Test that search errors are handled gracefully."""
+        mock_tavily = MagicMock()
+        mock_tavily.search = AsyncMock(side_effect=Exception("API Error"))
         
         state = {**sample_state_with_topic, "current_query": "test query"}
         
-        with patch('src.agent.nodes.search_client', mock_tavily):
-            result = search(state)
+        monkeypatch.setattr(nodes, "search_client", mock_tavily)
+        result = await search(state)
         
         assert "sources" in result
         assert "search_results" in result
@@ -208,175 +261,338 @@ class TestSearch:
 class TestSummarize:
     """Tests for summarize node."""
     
-    def test_updates_running_summary(self, sample_state_with_results, agent_config):
+    async def test_updates_running_summary(self, sample_state_with_results, mock_llm):
         """Test that running summary is updated with new information."""
-        from src.agent.nodes import summarize, init_agent
-        
-        mock_response = MagicMock()
-        mock_response.content = "Updated summary with meditation benefits including stress reduction and improved focus."
-        
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
-        
-        with patch('src.agent.nodes.llm') as mock_llm:
-            mock_llm.invoke.return_value = mock_response
-            result = summarize(sample_state_with_results)
+        mock_llm.ainvoke.return_value = SimpleNamespace(content="Updated summary with meditation benefits including stress reduction and improved focus.")
+        result = await summarize(sample_state_with_results)
         
         assert "running_summary" in result
         assert len(result["running_summary"]) > 0
     
-    def test_increments_iteration(self, sample_state_with_results, agent_config):
+    async def test_increments_iteration(self, sample_state_with_results, mock_llm):
         """Test that iteration counter is incremented."""
-        from src.agent.nodes import summarize, init_agent
+        state = {**sample_state_with_results, "iteration": 2}
         
-        mock_response = MagicMock()
-        mock_response.content = "Summary content"
+        mock_llm.ainvoke.return_value = SimpleNamespace(content="Summary content")
+        result = await summarize(state)
+        
+        assert result["iteration"] == 3
+    
+    async def test_appends_new_findings_to_summary(self, sample_state_with_results, mock_llm):
+        """Test that the new paragraph is appended and the prior summary is kept verbatim."""
+        state = {**sample_state_with_results, "running_summary": "Meditation reduces stress."}
         
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
+        mock_llm.ainvoke.return_value = SimpleNamespace(content="  Meditation also improves sleep.  ")
+        result = await summarize(state)
         
-        state = {**sample_state_with_results, "iteration": 2}
+        assert result["running_summary"] == "Meditation reduces stress.\n\nMeditation also improves sleep."
+    
+    async def test_keeps_summary_when_nothing_new(self, sample_state_with_results, mock_llm):
+        """Test that the summary is unchanged when the LLM reports no new information."""
+        state = {**sample_state_with_results, "running_summary": "Meditation reduces stress."}
         
-        with patch('src.agent.nodes.llm') as mock_llm:
-            mock_llm.invoke.return_value = mock_response
-            result = summarize(state)
+        mock_llm.ainvoke.return_value = SimpleNamespace(content="NO NEW INFORMATION")
+        result = await summarize(state)
         
-        assert result["iteration"] == 3
+        assert result["running_summary"] == "Meditation reduces stress."
     
-    def test_skips_when_no_search_results(self, sample_state_with_topic, agent_config):
-        """Test that summarize skips when there are no search results."""
-        from src.agent.nodes import summarize, init_agent
+    async def test_records_previous_summary_length(self, sample_state_with_results, mock_llm):
+        """Test that the pre-update summary length is stored for the growth check."""
+        state = {**sample_state_with_results, "running_summary": "Earlier findings."}
         
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
+        mock_llm.ainvoke.return_value = SimpleNamespace(content="More findings.")
+        result = await summarize(state)
         
+        assert result["prev_summary_len"] == len("Earlier findings.")
+    
+    async def test_trims_long_result_content(self, sample_state_with_results, mock_llm):
+        """Test that long content is cut to max_chars_per_source, keeping on-topic sentences."""
+        filler = "Unrelated filler text here. " * 100
+        result = {
+            "title": "Long page",
+            "url": "http://long.com",
+            "content": filler + "Meditation lowers cortisol levels. " + filler,
+        }
+        state = {**sample_state_with_results, "search_results": [result]}
+        
+        mock_llm.ainvoke.return_value = SimpleNamespace(content="Findings.")
+        await summarize(state)
+        
+        prompt = mock_llm.ainvoke.call_args[0][0]
+        assert "Meditation lowers cortisol levels. Unrelated filler" in prompt
+        assert len(prompt) < len(result["content"])
+    
+    async def test_summarizes_multiple_queries_in_one_call(self, sample_state_with_results, mock_llm):
+        """Test that results from several queries share one prompt, grouped by query."""
+        results = sample_state_with_results["search_results"]
+        state = {
+            **sample_state_with_results,
+            "search_results": [
+                {**results[0], "query": "meditation stress"},
+                {**results[1], "query": "meditation sleep"},
+                {**results[2], "query": "meditation stress"},
+            ]
+        }
+        
+        mock_llm.ainvoke.return_value = SimpleNamespace(content="Merged summary")
+        result = await summarize(state)
+        
+        mock_llm.ainvoke.assert_awaited_once()
+        prompt = mock_llm.ainvoke.call_args[0][0]
+        stress_at = prompt.index('### Results for "meditation stress"')
+        sleep_at = prompt.index('### Results for "meditation sleep"')
+        assert stress_at < prompt.index(results[2]["url"]) < sleep_at < prompt.index(results[1]["url"])
+        assert result["running_summary"] == "Merged summary"
+    
+    async def test_skips_when_no_search_results(self, sample_state_with_topic):
+        """Test that summarize skips when there are no search results."""
         state = {**sample_state_with_topic, "search_results": [], "iteration": 1}
-        result = summarize(state)
+        result = await summarize(state)
         
         assert result["iteration"] == 2
         assert "running_summary" not in result
+    
+    async def test_skip_records_summary_length(self, sample_state_with_topic, mock_router_llm):
+        """Test that a round with nothing new counts as no growth when routing."""
+        state = {
+            **sample_state_with_topic,
+            "running_summary": "A" * 500,
+            "prev_summary_len": 100,
+            "search_results": [],
+            "iteration": 1,
+        }
+        result = await summarize(state)
+        
+        assert result["prev_summary_len"] == 500
+        assert await should_continue({**state, **result}) == "write_report"
+        mock_router_llm.ainvoke.assert_not_awaited()
+
+
+class TestTrimContent:
+    """Tests for trimming search result content to the per-source budget."""
+    
+    def test_keeps_content_under_budget(self):
+        """Test that content that already fits is passed through as is."""
+        content = "Filler first. Meditation lowers cortisol. More filler."
+        
+        assert nodes._trim_content(content, {"meditation"}, 100) == content
+    
+    def test_fills_budget_after_relevant_sentences(self):
+        """Test that on-topic sentences come first, then the others in order."""
+        content = "First filler. Second filler. Meditation lowers cortisol. Third filler."
+        
+        trimmed = nodes._trim_content(content, {"meditation"}, 60)
+        
+        assert trimmed == "Meditation lowers cortisol. First filler. Second filler. Third filler."[:60]
+    
+    def test_stopword_overlap_is_not_relevant(self):
+        """Test that sharing only words like "what" or "with" doesn't make a sentence relevant."""
+        content = "What about this one first. Meditation lowers cortisol. That is all."
+        keywords = {w.lower() for w in nodes._KEYWORD.findall("What about meditation?")} - nodes._STOPWORDS
+        
+        trimmed = nodes._trim_content(content, keywords, 40)
+        
+        assert trimmed.startswith("Meditation lowers cortisol.")
+
+
+# A summary long enough that should_continue asks the routing LLM
+_LONG_SUMMARY = "A" * 300
+
+
+def _routing_state(summary: str, iteration: int = 2, **fields) -> dict:
+    """State for should_continue, at iteration 2 of 5 by default."""
+    return {
+        "topic": "test",
+        "running_summary": summary,
+        "iteration": iteration,
+        "max_iterations": 5,
+        **fields,
+    }
 
 
 class TestShouldContinue:
     """Tests for should_continue routing function."""
     
-    def test_returns_write_report_at_max_iterations(self, agent_config):
+    async def test_returns_write_report_at_max_iterations(self):
         """Test that write_report is returned at max iterations."""
-        from src.agent.nodes import should_continue, init_agent
-        
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
-        
-        state = {
-            "topic": "test",
-            "running_summary": "A" * 300,
-            "iteration": 5,
-            "max_iterations": 5
-        }
+        state = _routing_state(_LONG_SUMMARY, iteration=5)
         
-        result = should_continue(state)
+        result = await should_continue(state)
         assert result == "write_report"
     
-    def test_returns_generate_query_with_short_summary(self, agent_config):
+    async def test_returns_generate_query_with_short_summary(self):
         """Test that generate_query is returned when summary is too short."""
-        from src.agent.nodes import should_continue, init_agent
+        state = _routing_state("Short summary", iteration=1)
         
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
+        result = await should_continue(state)
+        assert result == "generate_query"
+    
+    async def test_consults_llm_with_long_summary(self, mock_router_llm):
+        """Test that LLM is consulted when summary is substantial."""
+        state = _routing_state(_LONG_SUMMARY)
         
-        state = {
-            "topic": "test",
-            "running_summary": "Short summary",  # Less than 200 chars
-            "iteration": 1,
-            "max_iterations": 5
-        }
+        mock_router_llm.ainvoke.return_value = SimpleNamespace(content="SUFFICIENT")
+        result = await should_continue(state)
+        
+        assert result == "write_report"
+        mock_router_llm.ainvoke.assert_awaited_once()
+    
+    async def test_continues_when_llm_says_continue(self, mock_router_llm):
+        """Test that research continues when LLM says CONTINUE."""
+        state = _routing_state(_LONG_SUMMARY)
+        
+        mock_router_llm.ainvoke.return_value = SimpleNamespace(content="CONTINUE")
+        result = await should_continue(state)
         
-        result = should_continue(state)
         assert result == "generate_query"
     
-    def test_consults_llm_with_long_summary(self, agent_config):
-        """Test that LLM is consulted when summary is substantial."""
-        from src.agent.nodes import should_continue, init_agent
+    @pytest.mark.parametrize("reply", ["Insufficient.", "Not sufficient", "SUFFICIENT? No, CONTINUE"])
+    async def test_only_bare_sufficient_ends_research(self, mock_router_llm, reply):
+        """Test that a reply other than the word SUFFICIENT is read as CONTINUE."""
+        state = _routing_state(_LONG_SUMMARY)
         
-        mock_response = MagicMock()
-        mock_response.content = "SUFFICIENT"
+        mock_router_llm.ainvoke.return_value = SimpleNamespace(content=reply)
+        result = await should_continue(state)
         
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
+        assert result == "generate_query"
+    
+    async def test_sufficient_ignores_case_and_whitespace(self, mock_router_llm):
+        """Test that the bare word is accepted in any case, with surrounding whitespace."""
+        state = _routing_state(_LONG_SUMMARY)
         
-        state = {
-            "topic": "test",
-            "running_summary": "A" * 300,  # More than 200 chars
-            "iteration": 2,
-            "max_iterations": 5
-        }
+        mock_router_llm.ainvoke.return_value = SimpleNamespace(content=" Sufficient.\n")
+        result = await should_continue(state)
         
-        with patch('src.agent.nodes.llm') as mock_llm:
-            mock_llm.invoke.return_value = mock_response
-            result = should_continue(state)
+        assert result == "write_report"
+    
+    async def test_enough_sources_skips_llm(self, agent_config, mock_router_llm, monkeypatch):
+        """Test that with min_sources set, many sources after min_iterations end research without the LLM."""
+        monkeypatch.setattr(nodes, "config", replace(agent_config, min_sources=8))
+        state = _routing_state(
+            "A" * 500,
+            iteration=agent_config.min_iterations,
+            sources=[{"url": f"http://{i}.com"} for i in range(8)],
+        )
+        
+        result = await should_continue(state)
         
         assert result == "write_report"
-        mock_llm.invoke.assert_called_once()
+        mock_router_llm.ainvoke.assert_not_awaited()
     
-    def test_continues_when_llm_says_continue(self, agent_config):
-        """Test that research continues when LLM says CONTINUE."""
-        from src.agent.nodes import should_continue, init_agent
+    async def test_source_count_alone_does_not_stop_by_default(self, agent_config, mock_router_llm):
+        """Test that a full first iteration's worth of sources doesn't end research by default."""
+        state = _routing_state(
+            _LONG_SUMMARY,
+            iteration=agent_config.min_iterations,
+            sources=[{"url": f"http://{i}.com"} for i in range(15)],
+        )
         
-        mock_response = MagicMock()
-        mock_response.content = "CONTINUE"
+        mock_router_llm.ainvoke.return_value = SimpleNamespace(content="CONTINUE")
+        result = await should_continue(state)
         
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
+        assert result == "generate_query"
+        mock_router_llm.ainvoke.assert_awaited_once()
+    
+    async def test_stalled_summary_skips_llm(self, mock_router_llm):
+        """Test that a summary that barely grew is treated as converged."""
+        state = _routing_state("A" * 500, prev_summary_len=450)
         
-        state = {
-            "topic": "test",
-            "running_summary": "A" * 300,
-            "iteration": 2,
-            "max_iterations": 5
-        }
+        result = await should_continue(state)
+        
+        assert result == "write_report"
+        mock_router_llm.ainvoke.assert_not_awaited()
+    
+    def test_router_uses_small_model(self, agent_config, monkeypatch):
+        """Test that init_agent builds a separate short-answer LLM for routing."""
+        mock_chat = MagicMock()
+        monkeypatch.setattr(nodes, "AsyncTavilyClient", MagicMock())
+        monkeypatch.setattr(nodes, "ChatOpenAI", mock_chat)
+        nodes.init_agent(agent_config, verbose=False)
+        
+        router_kwargs = mock_chat.call_args_list[-1].kwargs
+        assert router_kwargs["model"] == agent_config.router_model_name
+        assert router_kwargs["max_tokens"] == 4
+        assert nodes.router_llm is mock_chat.return_value
+    
+    async def test_long_summary_skips_llm(self, agent_config, mock_router_llm):
+        """Test that a summary past min_sufficient_chars ends research without the LLM."""
+        state = _routing_state("A" * agent_config.min_sufficient_chars)
         
-        with patch('src.agent.nodes.llm') as mock_llm:
-            mock_llm.invoke.return_value = mock_response
-            result = should_continue(state)
+        result = await should_continue(state)
         
-        assert result == "generate_query"
+        assert result == "write_report"
+        mock_router_llm.ainvoke.assert_not_awaited()
+    
+    async def test_reuses_cached_decision(self, mock_router_llm):
+        """Test that an equivalent research state reuses the LLM's decision."""
+        state = _routing_state(_LONG_SUMMARY)
+        
+        mock_router_llm.ainvoke.return_value = SimpleNamespace(content="CONTINUE")
+        first = await should_continue(state)
+        second = await should_continue({**state, "running_summary": "B" * 350})
+        
+        assert first == second == "generate_query"
+        mock_router_llm.ainvoke.assert_awaited_once()
 
 
 class TestWriteReport:
     """Tests for write_report node."""
     
-    def test_returns_ai_message(self, sample_state_with_summary, agent_config):
+    async def test_returns_ai_message(self, sample_state_with_summary, mock_llm):
         """Test that write_report returns an AIMessage."""
-        from src.agent.nodes import write_report, init_agent
-        
-        mock_response = MagicMock()
-        mock_response.content = "# Research Report\n\nThis is the final report content."
-        
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
-        
-        with patch('src.agent.nodes.llm') as mock_llm:
-            mock_llm.invoke.return_value = mock_response
-            result = write_report(sample_state_with_summary)
+        mock_llm.ainvoke.return_value = SimpleNamespace(content="# Research Report\n\nThis is the final report content.")
+        result = await write_report(sample_state_with_summary)
         
         assert "messages" in result
         assert len(result["messages"]) == 1
         assert isinstance(result["messages"][0], AIMessage)
     
-    def test_report_contains_content(self, sample_state_with_summary, agent_config):
+    async def test_report_contains_content(self, sample_state_with_summary, mock_llm):
         """Test that generated report has substantial content."""
-        from src.agent.nodes import write_report, init_agent
-        
-        mock_response = MagicMock()
-        mock_response.content = "# Research Report\n\n## Introduction\n\nDetailed findings about meditation benefits..."
-        
-        with patch('src.agent.nodes.TavilyClient'):
-            init_agent(agent_config, verbose=False)
-        
-        with patch('src.agent.nodes.llm') as mock_llm:
-            mock_llm.invoke.return_value = mock_response
-            result = write_report(sample_state_with_summary)
+        mock_llm.ainvoke.return_value = SimpleNamespace(content="# Research Report\n\n## Introduction\n\nDetailed findings about meditation benefits...")
+        result = await write_report(sample_state_with_summary)
         
         report_content = result["messages"][0].content
         assert len(report_content) > 50
-        assert "Research Report" in report_content
\ No newline at end of file
+        assert "Research Report" in report_content
+    
+    async def test_lists_each_source_once_with_first_title(self, sample_state_with_summary, mock_llm):
+        """Test that the prompt cites unique URLs, in order, capped at 15."""
+        sources = [{"title": "A", "url": "http://a.com", "content": ""},
+                   {"title": "A later", "url": "http://a.com", "content": ""}]
+        sources += [{"title": f"S{i}", "url": f"http://s{i}.com", "content": ""} for i in range(20)]
+        state = {**sample_state_with_summary, "sources": sources}
+        
+        mock_llm.ainvoke.return_value = SimpleNamespace(content="Report")
+        await write_report(state)
+        
+        prompt = mock_llm.ainvoke.call_args[0][0]
+        assert "[1] A: http://a.com\n[2] S0: http://s0.com\n" in prompt
+        assert "A later" not in prompt
+        assert "[15] S13: http://s13.com\n" in prompt
+        assert "S14" not in prompt
+
+
+class TestLazyImports:
+    """Tests for deferring the SDK imports to init_agent."""
+    
+    def test_import_does_not_load_sdks(self):
+        """Test that importing the graph leaves the OpenAI and Tavily SDKs unloaded."""
+        import subprocess
+        import sys
+        
+        code = (
+            "import sys, src.agent.graph; "
+            "print('langchain_openai' in sys.modules, 'tavily' in sys.modules)"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        
+        assert output.strip() == "False False"
+    
+    def test_sdk_classes_load_on_access(self):
+        """Test that the SDK classes are still reachable from the module."""
+        from langchain_openai import ChatOpenAI
+        
+        assert nodes.ChatOpenAI is ChatOpenAI
@@ -0,0 +1,43 @@
+"""
+Benchmarks for the hot constructors and prompt formatting.
+
+These give baseline timings, so refactors of AgentConfig or the prompt
+templates can be measured. They need pytest-benchmark and only run when
+asked for:
+
+    pytest tests/test_perf.py --benchmark-only
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from src.agent.config import AgentConfig, SUMMARIZE_PROMPT, WRITE_REPORT_PROMPT
+
+
+def test_agent_config_construction(benchmark):
+    """Benchmark building a default AgentConfig."""
+    config = benchmark(AgentConfig)
+    assert config.max_iterations == 5
+
+
+def test_summarize_prompt_format(benchmark):
+    """Benchmark formatting the summarize prompt with realistic sizes."""
+    formatted = benchmark(
+        SUMMARIZE_PROMPT.format,
+        topic="benefits of meditation",
+        running_summary="Research notes. " * 200,
+        search_results="[1] Title: Result\nContent: text\n" * 15,
+    )
+    assert "benefits of meditation" in formatted
+
+
+def test_write_report_prompt_format(benchmark):
+    """Benchmark formatting the report prompt with realistic sizes."""
+    formatted = benchmark(
+        WRITE_REPORT_PROMPT.format,
+        topic="benefits of meditation",
+        running_summary="Research notes. " * 400,
+        sources="[1] Source: https://example.com\n" * 15,
+    )
+    assert "https://example.com" in formatted
@@ -4,141 +4,142 @@ Tests for the ResearchState definition.
 
 import pytest
 from langchain_core.messages import HumanMessage, AIMessage
-from src.agent.state import ResearchState
+from src.agent.state import ResearchState, merge_search_results, merge_sources
+
+# An empty research state; tests fill in the fields they look at. None of
+# them mutate it, so its lists can be shared.
+_BASE_STATE: ResearchState = {
+    "messages": [],
+    "topic": "",
+    "running_summary": "",
+    "sources": [],
+    "search_results": [],
+    "current_query": "",
+    "iteration": 0,
+    "max_iterations": 5
+}
+
+
+# Messages shared by the state cases below; none of them change a message
+_HUMAN_MESSAGE = HumanMessage(content="What is AI?")
+_AI_MESSAGE = AIMessage(content="Here is the report...")
+
+_SOURCES = [
+    {"title": "Source 1", "url": "https://example.com/1", "content": "Content 1"},
+    {"title": "Source 2", "url": "https://example.com/2", "content": "Content 2"}
+]
 
 
 class TestResearchState:
     """Tests for ResearchState TypedDict."""
     
-    def test_state_has_required_fields(self):
-        """Test that state can be created with all required fields."""
-        state: ResearchState = {
-            "messages": [HumanMessage(content="test query")],
-            "topic": "test topic",
-            "running_summary": "",
-            "sources": [],
-            "search_results": [],
-            "current_query": "",
-            "iteration": 0,
-            "max_iterations": 5
-        }
+    @pytest.mark.parametrize("overrides,check", [
+        pytest.param(
+            {"messages": [_HUMAN_MESSAGE], "topic": "test topic"},
+            lambda s: set(_BASE_STATE) <= set(s),
+            id="has_required_fields",
+        ),
+        pytest.param(
+            {"messages": [_HUMAN_MESSAGE]},
+            lambda s: len(s["messages"]) == 1 and s["messages"][0].content == "What is AI?",
+            id="messages_accept_human_message",
+        ),
+        pytest.param(
+            {"messages": [_AI_MESSAGE]},
+            lambda s: len(s["messages"]) == 1 and s["messages"][0].content == "Here is the report...",
+            id="messages_accept_ai_message",
+        ),
+        pytest.param(
+            {"messages": [_HUMAN_MESSAGE, _AI_MESSAGE], "topic": "artificial intelligence"},
+            lambda s: [type(m) for m in s["messages"]] == [HumanMessage, AIMessage],
+            id="messages_accept_both",
+        ),
+        pytest.param(
+            {"sources": _SOURCES},
+            lambda s: (len(s["sources"]) == 2
+                       and s["sources"][0]["title"] == "Source 1"
+                       and s["sources"][1]["url"] == "https://example.com/2"),
+            id="sources_accept_list_of_dicts",
+        ),
+        pytest.param(
+            {"sources": [{"title": "Old", "url": "http://old.com", "content": "old"}],
+             "search_results": [{"title": "New", "url": "http://new.com", "content": "new"}]},
+            lambda s: ([r["title"] for r in s["sources"]] == ["Old"]
+                       and [r["title"] for r in s["search_results"]] == ["New"]),
+            id="search_results_separate_from_sources",
+        ),
+        pytest.param(
+            {"iteration": 3},
+            lambda s: s["iteration"] == 3 and s["iteration"] < s["max_iterations"] == 5,
+            id="iteration_tracking",
+        ),
+    ])
+    def test_state_fields(self, overrides, check):
+        """Test that a state built with the given fields holds them as expected."""
+        state = {**_BASE_STATE, **overrides}
         
-        assert "messages" in state
-        assert "topic" in state
-        assert "running_summary" in state
-        assert "sources" in state
-        assert "search_results" in state
-        assert "current_query" in state
-        assert "iteration" in state
-        assert "max_iterations" in state
+        assert check(state)
+
+
+class TestMergeSearchResults:
+    """Tests for the search_results reducer."""
     
-    def test_messages_field_accepts_human_message(self):
-        """Test that messages field works with HumanMessage."""
-        human_msg = HumanMessage(content="What is AI?")
-        state: ResearchState = {
-            "messages": [human_msg],
-            "topic": "",
-            "running_summary": "",
-            "sources": [],
-            "search_results": [],
-            "current_query": "",
-            "iteration": 0,
-            "max_iterations": 5
-        }
+    def test_appends_parallel_results(self):
+        """Test that results from parallel searches are combined."""
+        left = [{"title": "A", "url": "http://a.com", "content": "a"}]
+        right = [{"title": "B", "url": "http://b.com", "content": "b"}]
+        
+        merged = merge_search_results(left, right)
         
-        assert len(state["messages"]) == 1
-        assert state["messages"][0].content == "What is AI?"
+        assert [r["title"] for r in merged] == ["A", "B"]
     
-    def test_messages_field_accepts_ai_message(self):
-        """Test that messages field works with AIMessage."""
-        ai_msg = AIMessage(content="Here is the report...")
-        state: ResearchState = {
-            "messages": [ai_msg],
-            "topic": "",
-            "running_summary": "",
-            "sources": [],
-            "search_results": [],
-            "current_query": "",
-            "iteration": 0,
-            "max_iterations": 5
-        }
+    def test_skips_results_already_in_batch(self):
+        """Test that a page returned by two parallel searches is summarized once."""
+        left = [{"title": "A", "url": "http://a.com", "content": "a", "query": "q1"}]
+        right = [
+            {"title": "A", "url": "http://a.com", "content": "a", "query": "q2"},
+            {"title": "B", "url": "http://b.com", "content": "b", "query": "q2"},
+        ]
+        
+        merged = merge_search_results(left, right)
         
-        assert len(state["messages"]) == 1
-        assert state["messages"][0].content == "Here is the report..."
+        assert [(r["url"], r["query"]) for r in merged] == [("http://a.com", "q1"), ("http://b.com", "q2")]
     
-    def test_messages_field_accepts_multiple_messages(self):
-        """Test that messages can hold both human and AI messages."""
-        state: ResearchState = {
-            "messages": [
-                HumanMessage(content="Research quantum computing"),
-                AIMessage(content="Here is my report on quantum computing...")
-            ],
-            "topic": "quantum computing",
-            "running_summary": "",
-            "sources": [],
-            "search_results": [],
-            "current_query": "",
-            "iteration": 0,
-            "max_iterations": 5
-        }
+    def test_none_clears_results(self):
+        """Test that writing None starts a fresh batch."""
+        left = [{"title": "A", "url": "http://a.com", "content": "a"}]
         
-        assert len(state["messages"]) == 2
-        assert isinstance(state["messages"][0], HumanMessage)
-        assert isinstance(state["messages"][1], AIMessage)
+        assert merge_search_results(left, None) == []
+
+
+class TestMergeSources:
+    """Tests for the sources reducer."""
     
-    def test_sources_accepts_list_of_dicts(self):
-        """Test that sources field accepts list of dictionaries."""
-        sources = [
-            {"title": "Source 1", "url": "https://example.com/1", "content": "Content 1"},
-            {"title": "Source 2", "url": "https://example.com/2", "content": "Content 2"}
-        ]
+    def test_appends_new_sources(self):
+        """Test that sources with new URLs are appended in order."""
+        left = [{"title": "A", "url": "http://a.com", "content": "a"}]
+        right = [{"title": "B", "url": "http://b.com", "content": "b"}]
         
-        state: ResearchState = {
-            "messages": [],
-            "topic": "",
-            "running_summary": "",
-            "sources": sources,
-            "search_results": [],
-            "current_query": "",
-            "iteration": 0,
-            "max_iterations": 5
-        }
+        merged = merge_sources(left, right)
         
-        assert len(state["sources"]) == 2
-        assert state["sources"][0]["title"] == "Source 1"
-        assert state["sources"][1]["url"] == "https://example.com/2"
+        assert [s["url"] for s in merged] == ["http://a.com", "http://b.com"]
     
-    def test_search_results_separate_from_sources(self):
-        """Test that search_results and sources are independent."""
-        state: ResearchState = {
-            "messages": [],
-            "topic": "",
-            "running_summary": "",
-            "sources": [{"title": "Old", "url": "http://old.com", "content": "old"}],
-            "search_results": [{"title": "New", "url": "http://new.com", "content": "new"}],
-            "current_query": "",
-            "iteration": 0,
-            "max_iterations": 5
-        }
+    def test_skips_duplicate_urls(self):
+        """Test that a URL already gathered, or repeated in the update, is kept once."""
+        left = [{"title": "A", "url": "http://a.com", "content": "a"}]
+        right = [
+            {"title": "A again", "url": "http://a.com", "content": "a2"},
+            {"title": "B", "url": "http://b.com", "content": "b"},
+            {"title": "B again", "url": "http://b.com", "content": "b2"},
+        ]
+        
+        merged = merge_sources(left, right)
         
-        assert len(state["sources"]) == 1
-        assert len(state["search_results"]) == 1
-        assert state["sources"][0]["title"] == "Old"
-        assert state["search_results"][0]["title"] == "New"
+        assert [s["title"] for s in merged] == ["A", "B"]
+        assert left == [{"title": "A", "url": "http://a.com", "content": "a"}]
     
-    def test_iteration_tracking(self):
-        """Test iteration counter fields."""
-        state: ResearchState = {
-            "messages": [],
-            "topic": "",
-            "running_summary": "",
-            "sources": [],
-            "search_results": [],
-            "current_query": "",
-            "iteration": 3,
-            "max_iterations": 5
-        }
+    def test_empty_update_keeps_list(self):
+        """Test that a branch that found nothing new doesn't copy the list."""
+        left = [{"title": "A", "url": "http://a.com", "content": "a"}]
         
-        assert state["iteration"] == 3
-        assert state["max_iterations"] == 5
-        assert state["iteration"] < state["max_iterations"]
\ No newline at end of file
+        assert merge_sources(left, []) is left
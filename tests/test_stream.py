@@ -0,0 +1,71 @@
+"""
+Tests for the async stream helpers.
+"""
+
+import asyncio
+
+import pytest
+from src.agent._stream import buffered
+
+
+async def _count(n, closed=None):
+    """Yield 0..n-1, recording when the generator is closed."""
+    try:
+        for i in range(n):
+            yield i
+            await asyncio.sleep(0)
+    finally:
+        if closed is not None:
+            closed.append(True)
+
+
+class TestBuffered:
+    """Tests for the buffered async iterator."""
+    
+    async def test_yields_all_items_in_order(self):
+        """Test that every item comes through in order."""
+        items = [i async for i in buffered(_count(50), size=4)]
+        
+        assert items == list(range(50))
+    
+    async def test_reads_ahead_of_consumer(self):
+        """Test that the producer fills the buffer while the consumer waits."""
+        produced = []
+        
+        async def source():
+            for i in range(10):
+                produced.append(i)
+                yield i
+        
+        stream = buffered(source(), size=3)
+        first = await stream.__anext__()
+        await asyncio.sleep(0.01)
+        
+        assert first == 0
+        assert len(produced) > 1
+        await stream.aclose()
+    
+    async def test_propagates_source_errors(self):
+        """Test that an error in the source is raised to the consumer."""
+        async def failing():
+            yield 1
+            raise ValueError("boom")
+        
+        received = []
+        with pytest.raises(ValueError, match="boom"):
+            async for item in buffered(failing()):
+                received.append(item)
+        
+        assert received == [1]
+    
+    async def test_early_exit_closes_source(self):
+        """Test that stopping early cancels the producer and closes the source."""
+        closed = []
+        stream = buffered(_count(100, closed), size=2)
+        
+        async for item in stream:
+            if item == 3:
+                break
+        await stream.aclose()
+        
+        assert closed == [True]